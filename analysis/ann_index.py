@@ -0,0 +1,226 @@
+import os
+import threading
+
+import numpy as np
+
+from feature_store import FeatureStore
+from image_similarity import select_top_k
+
+# 한 번에 읽어 정규화·할당할 행 수 (메모리 상한)
+_CHUNK_ROWS = 65536
+
+
+def _inverse_norms(vectors: np.ndarray) -> np.ndarray:
+    norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+    with np.errstate(divide="ignore"):
+        return np.where(norms > 0, 1.0 / norms, 0.0).astype(np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors * _inverse_norms(vectors)[:, None]
+
+
+class IVFIndex:
+    """
+    FeatureStore의 모든 벡터에 대한 근사 최근접 이웃 인덱스 (IVF, 순수 NumPy).
+    - 학습: 샘플에 구면 k-means를 돌려 nlist개의 중심을 만들고, 각 행을 가장 가까운 중심의 리스트에 넣는다
+    - 추가: FeatureStore는 행이 뒤에 붙기만 하므로, sync가 새 행만 가장 가까운 중심에 할당
+    - 검색: 질의와 가까운 중심 nprobe개의 리스트만 모아 코사인 유사도를 정확히 계산
+      (행별 노름 역수를 미리 들고 있어 질의마다 후보 노름을 다시 계산하지 않는다)
+    - min_train개 미만이면 학습 없이 전체를 직접 비교 (그 정도는 한 번의 행렬-벡터 곱으로 충분)
+    - 행 수가 학습 시점의 retrain_factor배를 넘으면 중심을 다시 학습
+    중심과 행별 리스트 번호는 path(.npz)에 저장하고, 재시작 시 불러온 뒤 이후 추가된 행만 할당한다.
+    """
+
+    def __init__(
+        self,
+        store: FeatureStore,
+        path: str,
+        nprobe: int = 8,
+        min_train: int = 4096,
+        retrain_factor: float = 4.0,
+        kmeans_iters: int = 10,
+        seed: int = 0,
+    ):
+        self.store = store
+        self.path = path
+        self.nprobe = max(1, nprobe)
+        self.min_train = max(1, min_train)
+        self.retrain_factor = retrain_factor
+        self.kmeans_iters = kmeans_iters
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._centroids: np.ndarray | None = None
+        self._assign = np.empty(0, dtype=np.int32)
+        self._inv_norms = np.empty(0, dtype=np.float32)
+        self._lists: list[np.ndarray] = []
+        self._trained_on = 0
+        # 인덱스에 반영된 행 수 (학습 전에는 전체 비교 대상 행 수)
+        self._indexed = 0
+        self._load()
+
+    @classmethod
+    def from_env(cls, store: FeatureStore, directory: str) -> "IVFIndex":
+        return cls(
+            store,
+            path=os.path.join(directory, "ivf.npz"),
+            nprobe=int(os.getenv("IMAGE_ANN_NPROBE", "8")),
+            min_train=int(os.getenv("IMAGE_ANN_MIN_TRAIN", "4096")),
+        )
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def pending(self) -> int:
+        """FeatureStore에는 있지만 아직 인덱스에 반영되지 않은 행 수."""
+        return self.store.count - self._indexed
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                centroids = data["centroids"].astype(np.float32)
+                assign = data["assign"].astype(np.int32)
+                inv_norms = data["inv_norms"].astype(np.float32)
+                trained_on = int(data["trained_on"])
+        except Exception as e:
+            print(f"[ann] ignoring unreadable index {self.path}: {e}")
+            return
+        # 저장소가 잘렸거나 차원이 다르면 다시 만든다
+        if (
+            centroids.shape[1:] != (self.store.dim,)
+            or assign.size > self.store.count
+            or inv_norms.size != assign.size
+        ):
+            return
+        self._centroids = centroids
+        self._set_assign(assign)
+        self._inv_norms = inv_norms
+        self._trained_on = trained_on
+        self._indexed = assign.size
+
+    def _save(self) -> None:
+        if self._centroids is None:
+            return
+        tmp = self.path + ".tmp.npz"
+        np.savez(
+            tmp,
+            centroids=self._centroids,
+            assign=self._assign,
+            inv_norms=self._inv_norms,
+            trained_on=np.int64(self._trained_on),
+        )
+        os.replace(tmp, self.path)
+
+    def _set_assign(self, assign: np.ndarray) -> None:
+        """행별 리스트 번호로부터 리스트별 행 번호(오름차순) 배열을 만든다."""
+        self._assign = assign
+        order = np.argsort(assign, kind="stable")
+        bounds = np.cumsum(np.bincount(assign, minlength=len(self._centroids)))[:-1]
+        self._lists = np.split(order.astype(np.int64), bounds)
+
+    def _scan(self, start: int, stop: int, assign: bool) -> tuple[np.ndarray, np.ndarray | None]:
+        """[start, stop) 행의 노름 역수와 (assign이면) 가장 가까운 중심 번호."""
+        inv_norms = np.empty(stop - start, dtype=np.float32)
+        nearest = np.empty(stop - start, dtype=np.int32) if assign else None
+        for lo in range(start, stop, _CHUNK_ROWS):
+            hi = min(lo + _CHUNK_ROWS, stop)
+            block = np.asarray(self.store.rows(lo, hi), dtype=np.float32)
+            inv = _inverse_norms(block)
+            inv_norms[lo - start : hi - start] = inv
+            if assign:
+                scores = (block @ self._centroids.T) * inv[:, None]
+                nearest[lo - start : hi - start] = np.argmax(scores, axis=1)
+        return inv_norms, nearest
+
+    def _train(self, n: int) -> None:
+        # min_train이 16보다 작으면 행 수보다 중심이 많아질 수 있으므로 n으로 한 번 더 제한
+        nlist = min(int(np.clip(np.sqrt(n), 16, 4096)), n)
+        # 중심당 32개 정도면 k-means 품질에 충분하고 학습 시간은 n과 무관해진다
+        sample_size = min(n, nlist * 32)
+        sample_rows = np.sort(self._rng.choice(n, size=sample_size, replace=False))
+        sample = _normalize(self.store.take(sample_rows))
+
+        centroids = sample[self._rng.choice(sample_size, size=nlist, replace=False)]
+        for _ in range(self.kmeans_iters):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                # 빈 클러스터는 임의의 샘플로 다시 시작
+                sums[empty] = sample[self._rng.choice(sample_size, size=int(empty.sum()))]
+            centroids = _normalize(sums)
+
+        self._centroids = centroids
+        self._trained_on = n
+        self._inv_norms, assign = self._scan(0, n, assign=True)
+        self._set_assign(assign)
+
+    def sync(self) -> int:
+        """FeatureStore에 새로 추가된 행을 인덱스에 반영하고, 반영한 행 수를 반환."""
+        with self._lock:
+            n = self.store.count
+            added = n - self._indexed
+            if added <= 0:
+                return 0
+            if (self._centroids is None and n >= self.min_train) or (
+                self._centroids is not None and n > self._trained_on * self.retrain_factor
+            ):
+                self._train(n)
+                self._save()
+            else:
+                inv_norms, new_assign = self._scan(
+                    self._indexed, n, assign=self._centroids is not None
+                )
+                self._inv_norms = np.concatenate([self._inv_norms, inv_norms])
+                if new_assign is not None:
+                    for list_no in np.unique(new_assign):
+                        new_rows = np.flatnonzero(new_assign == list_no) + self._indexed
+                        self._lists[list_no] = np.concatenate([self._lists[list_no], new_rows])
+                    self._assign = np.concatenate([self._assign, new_assign])
+                    self._save()
+            self._indexed = n
+            return added
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 10,
+        threshold: float = 0.7,
+        nprobe: int | None = None,
+    ) -> list[tuple[str, float]]:
+        """질의 벡터와 유사한 이미지의 (URL, 유사도)를 유사도 내림차순으로 반환."""
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        with self._lock:
+            if self._indexed == 0:
+                return []
+            if self._centroids is None:
+                rows = np.arange(self._indexed)
+                candidates = np.asarray(self.store.rows(0, self._indexed))
+            else:
+                probe = min(self.nprobe if nprobe is None else nprobe, len(self._centroids))
+                nearest = np.argpartition(-(self._centroids @ query), probe - 1)[:probe]
+                # 행 번호 순으로 읽어야 memmap 접근이 순차에 가깝다
+                rows = np.sort(np.concatenate([self._lists[i] for i in nearest]))
+                candidates = self.store.take(rows)
+            sims = (candidates @ query) * self._inv_norms[rows]
+        idx, sims = select_top_k(sims, threshold=threshold, top_k=top_k)
+        idx = rows[idx]
+        return [(self.store.url_at(int(i)), float(sim)) for i, sim in zip(idx, sims)]
+
+    def stats(self) -> dict:
+        sizes = [len(rows) for rows in self._lists]
+        return {
+            "indexed": self._indexed,
+            "trained": self.trained,
+            "nlist": len(sizes),
+            "nprobe": self.nprobe,
+            "trained_on": self._trained_on,
+            "max_list_size": max(sizes) if sizes else 0,
+        }
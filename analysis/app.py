@@ -1,25 +1,406 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import List
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 
-from sentiment_analysis import SentimentAnalyzer
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
-app = FastAPI()
-analyzer = SentimentAnalyzer()
+from ann_index import IVFIndex
+from db import close_pool
+from feature_store import FeatureStore
+from image_hash import ImageHashIndex
+from image_similarity import (
+    close_http_client,
+    fetch_target_features,
+    find_similar_images,
+    ingest_features,
+    use_analysis_pool,
+)
+from keyword_index import WINDOWS, KeywordIndex
+from result_cache import ScoreCache
+from sentiment_analysis import SentimentAccumulator, SentimentAnalyzer
+from sentiment_history import GRANULARITIES, SentimentHistory
+from worker_pool import AnalysisPool
+
+# CPU 작업용 프로세스 풀 (ANALYSIS_WORKERS=0이면 없음 → 요청 스레드에서 처리)
+analysis_pool = AnalysisPool.from_env()
+use_analysis_pool(analysis_pool)
+
+# 점수 캐시 메모리 상한 (MB). 0이면 캐시 비활성화
+_cache_max_mb = float(os.getenv("ANALYSIS_CACHE_MAX_MB", "64"))
+score_cache = (
+    ScoreCache(max_bytes=int(_cache_max_mb * 1024 * 1024)) if _cache_max_mb > 0 else None
+)
+analyzer = SentimentAnalyzer(cache=score_cache, pool=analysis_pool)
+keyword_index = KeywordIndex(tokenize=analyzer.tokenize_keywords)
+# 게시글별 점수 + 종목별 감정 롤업 (DATABASE_URL이 있을 때만)
+sentiment_history = SentimentHistory(analyzer)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 워커는 시작 시 한 번 띄워 감정 사전을 넘겨 두고, 종료 시 정리
+    if analysis_pool is not None:
+        await run_in_threadpool(analysis_pool.start, analyzer.EMOTION_DICT)
+    yield
+    if analysis_pool is not None:
+        await run_in_threadpool(analysis_pool.shutdown)
+    await close_crawler_client()
+    await close_http_client()
+    close_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# 이미지 URL -> 히스토그램 벡터 디스크 저장소 (유사도 비교 시 다운로드·디코딩 생략)
+_feature_store_dir = os.getenv("IMAGE_FEATURE_STORE_DIR", "data/image_features")
+feature_store = FeatureStore(_feature_store_dir)
+# 저장된 전체 이미지에 대한 근사 최근접 이웃 인덱스 (같은 디렉터리에 영속)
+image_index = IVFIndex.from_env(feature_store, _feature_store_dir)
+# 이미지 dHash → 다른 URL로 재게시된 같은 이미지를 대표 URL로 묶는다
+image_hashes = ImageHashIndex.from_env(_feature_store_dir)
+# 백그라운드 특징 추출 task (GC로 사라지지 않도록 참조 유지)
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _background_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[background] task failed: {task.exception()!r}")
+
+
+def run_in_background(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_done)
+
+
+async def ingest_and_index(urls: list[str]) -> dict:
+    """특징을 저장한 뒤 새 행을 이미지 인덱스에 반영."""
+    result = await ingest_features(urls, feature_store, hashes=image_hashes)
+    if result["added"]:
+        await run_in_threadpool(image_index.sync)
+    return result
+
+
+# /pipeline이 스트리밍으로 피드를 받아올 크롤러 서비스 (없으면 /pipeline만 503)
+CRAWLER_URL = os.getenv("CRAWLER_URL", "").rstrip("/")
+_crawler_client: httpx.AsyncClient | None = None
+
+
+def crawler_client() -> httpx.AsyncClient:
+    global _crawler_client
+    if _crawler_client is None:
+        # 크롤링은 수십 초 걸릴 수 있으므로 read timeout은 넉넉하게
+        _crawler_client = httpx.AsyncClient(
+            base_url=CRAWLER_URL, timeout=httpx.Timeout(10.0, read=120.0)
+        )
+    return _crawler_client
+
+
+async def close_crawler_client() -> None:
+    global _crawler_client
+    if _crawler_client is not None:
+        await _crawler_client.aclose()
+        _crawler_client = None
 
 
 class SentimentRequest(BaseModel):
     texts: List[str]
+    # rows: 텍스트별 객체 리스트 (기존 형식), columns: 컬럼별 배열 (대량 배치용)
+    format: Literal["rows", "columns"] = "rows"
+    # False면 텍스트별 결과 없이 summary·top_keywords만 반환 (응답 크기 축소)
+    include_results: bool = True
+    # 지정하면 텍스트를 종목별 키워드 인덱스에도 반영
+    stock_id: Optional[str] = None
+
+
+class PipelineRequest(BaseModel):
+    stock_id: str
+    max_scrolls: int = 5
+    save: bool = True
+    incremental: bool = False
+    # True면 게시글별 결과(postId, score, label, confidence)도 반환
+    include_results: bool = False
+
+
+class CompareImagesRequest(BaseModel):
+    target_image: str
+    images: List[str]
+    # 동시 다운로드 수 (None이면 IMAGE_DOWNLOAD_CONCURRENCY)
+    concurrency: Optional[int] = Field(None, ge=1)
+    # 이 값보다 유사도가 높은 이미지만, 상위 top_k개까지 (None이면 전부, 0이면 없음)
+    threshold: float = 0.7
+    top_k: Optional[int] = Field(None, ge=0)
+
+
+class ImageFeaturesRequest(BaseModel):
+    urls: List[str]
+
+
+class SimilarImagesRequest(BaseModel):
+    target_image: str
+    threshold: float = 0.7
+    top_k: int = Field(10, ge=0)
+    # 검색할 IVF 리스트 수 (None이면 IMAGE_ANN_NPROBE). 클수록 정확하고 느림
+    nprobe: Optional[int] = Field(None, ge=1)
+
+
+class KeywordIndexRequest(BaseModel):
+    stock_id: str
+    texts: List[str]
+
+
+def _columns_to_rows(columns: dict) -> list[dict]:
+    probs = columns["class_probabilities"]
+    prob_labels = list(probs.keys())
+    return [
+        {
+            "score": score,
+            "label": label,
+            "confidence": confidence,
+            "class_probabilities": dict(zip(prob_labels, row)),
+        }
+        for score, label, confidence, row in zip(
+            columns["score"],
+            columns["label"],
+            columns["confidence"],
+            zip(*probs.values()),
+        )
+    ]
 
 
 @app.post("/analysis")
 def analyze(request: SentimentRequest):
     texts = request.texts or []
-    results = [analyzer.analyze_text(text) for text in texts]
-    top_keywords = analyzer.extract_top_keywords(texts, top_n=3)
-    return {"results": results, "top_keywords": top_keywords}
+    # 채점과 키워드 집계를 한 번에 (큰 배치는 프로세스 풀에 청크로 나눠 처리)
+    accumulator = SentimentAccumulator(analyzer)
+    accumulator.add(texts)
+    columns, summary = accumulator.finish(include_columns=request.include_results)
+    top_keywords = accumulator.top_keywords(top_n=3)
+    if request.stock_id:
+        keyword_index.add(request.stock_id, texts)
+    if columns is None:
+        return {"summary": summary, "top_keywords": top_keywords}
+    if request.format == "columns":
+        # 컬럼은 이미 JSON 기본 타입 리스트라 인코딩 단계를 건너뛰고 바로 직렬화
+        return JSONResponse(
+            {"columns": columns, "summary": summary, "top_keywords": top_keywords}
+        )
+    return {
+        "results": _columns_to_rows(columns),
+        "summary": summary,
+        "top_keywords": top_keywords,
+    }
+
+
+@app.post("/pipeline")
+async def pipeline(request: PipelineRequest):
+    """
+    크롤러 /crawl을 NDJSON 스트림으로 받아, 스크롤 배치가 도착하는 대로 바로 채점.
+    Next.js를 거치지 않고 크롤러 → 분석으로 한 번만 전달되며, 응답은 요약 + 키워드 (+ 선택적으로 게시글별 결과).
+    스트림이 done 이벤트 없이 끝나면 (크롤러 중단·연결 끊김) 부분 결과 대신 502.
+    """
+    if not CRAWLER_URL:
+        raise HTTPException(status_code=503, detail="CRAWLER_URL is not configured")
+    accumulator = SentimentAccumulator(analyzer)
+    post_ids: list[str] = []
+    texts: list[str] = []
+    image_urls: list[str] = []
+
+    crawl_body = {
+        "stock_id": request.stock_id,
+        "max_scrolls": request.max_scrolls,
+        "save": request.save,
+        "incremental": request.incremental,
+        "stream": "ndjson",
+    }
+    done = False
+    try:
+        async with crawler_client().stream("POST", "/crawl", json=crawl_body) as res:
+            if res.status_code != 200:
+                detail = (await res.aread()).decode(errors="replace")
+                raise HTTPException(status_code=502, detail=f"Crawl failed: {detail}")
+            async for line in res.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["type"] == "error":
+                    raise HTTPException(status_code=502, detail=f"Crawl failed: {event['detail']}")
+                if event["type"] == "done":
+                    done = True
+                    break
+                if event["type"] != "batch":
+                    continue
+                for p in event["posts"]:
+                    image_urls.extend(p.get("imageSrcs") or [])
+                posts = [p for p in event["posts"] if p.get("text")]
+                batch_texts = [p["text"] for p in posts]
+                # 채점은 CPU 작업이라 이벤트 루프 밖에서
+                await run_in_threadpool(accumulator.add, batch_texts)
+                texts.extend(batch_texts)
+                post_ids.extend(p["postId"] for p in posts)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Crawler unreachable: {e}")
+    except json.JSONDecodeError as e:
+        # 연결이 끊기며 마지막 줄이 잘린 경우
+        raise HTTPException(status_code=502, detail=f"Malformed crawl stream: {e}")
+    if not done:
+        raise HTTPException(status_code=502, detail="Crawl stream ended before completion")
+
+    columns, summary = accumulator.finish(include_columns=request.include_results)
+    # 토큰화도 CPU 작업이라 이벤트 루프 밖에서
+    await run_in_threadpool(keyword_index.add, request.stock_id, texts)
+    if request.save and post_ids:
+        # 저장된 게시글 행에 점수를 기록하고 롤업 갱신 (응답은 기다리지 않음)
+        run_in_background(
+            asyncio.to_thread(
+                sentiment_history.record,
+                request.stock_id,
+                post_ids,
+                texts,
+                *accumulator.arrays(),
+            )
+        )
+    if image_urls:
+        # 크롤링 시점에 이미지 특징을 미리 저장해 두면 이후 유사도 비교는 다운로드 없이 처리
+        run_in_background(ingest_and_index(image_urls))
+    response = {
+        "stock_id": request.stock_id,
+        "summary": summary,
+        "top_keywords": accumulator.top_keywords(top_n=3),
+    }
+    if columns is not None:
+        response["results"] = [
+            {"postId": post_id, "score": score, "label": label, "confidence": confidence}
+            for post_id, score, label, confidence in zip(
+                post_ids, columns["score"], columns["label"], columns["confidence"]
+            )
+        ]
+    return response
+
+
+@app.post("/compare-images")
+async def compare_images(request: CompareImagesRequest):
+    try:
+        # 이미지 유사도 비교 로직 실행
+        kwargs = {"concurrency": request.concurrency} if request.concurrency is not None else {}
+        similar_images = await find_similar_images(
+            request.target_image,
+            request.images,
+            store=feature_store,
+            threshold=request.threshold,
+            top_k=request.top_k,
+            **kwargs,
+        )
+        return {"status": "success", "data": similar_images}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@app.post("/image-features")
+async def add_image_features(request: ImageFeaturesRequest):
+    """이미지 특징 벡터를 미리 계산해 저장 (이미 저장된 URL은 건너뜀)."""
+    return await ingest_and_index(request.urls)
+
+
+@app.post("/similar-images")
+async def similar_images(request: SimilarImagesRequest):
+    """지금까지 저장된 모든 이미지 중 대상 이미지와 비슷한 이미지 검색 (IVF 근사 검색)."""
+    try:
+        target_features = await fetch_target_features(
+            request.target_image, store=feature_store, hashes=image_hashes
+        )
+        # 검색은 이미 반영된 행만 본다. 대상 이미지가 새로 저장됐으면 인덱스 반영은
+        # (재학습이면 수 초 걸리므로) 응답을 막지 않도록 백그라운드에서
+        if image_index.pending > 0:
+            run_in_background(run_in_threadpool(image_index.sync))
+        # 재게시된 같은 이미지는 하나로 묶으므로 여유 있게 가져온다
+        matches = await run_in_threadpool(
+            image_index.search,
+            target_features,
+            top_k=request.top_k * 4 + 1,
+            threshold=request.threshold,
+            nprobe=request.nprobe,
+        )
+        # 대상 이미지 자신(과 그 재게시본)은 결과에서 빼고, 대표 URL별로 가장 유사한 하나만 남긴다
+        target_group = image_hashes.canonical(request.target_image)
+        groups: dict[str, dict] = {}
+        for url, similarity in matches:
+            group = image_hashes.canonical(url)
+            if url == request.target_image or group == target_group:
+                continue
+            if group in groups:
+                groups[group]["duplicates"] += 1
+            elif len(groups) < request.top_k:
+                groups[group] = {"image": url, "similarity": similarity, "duplicates": 0}
+        return {"status": "success", "data": list(groups.values())}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@app.post("/keywords")
+def add_keywords(request: KeywordIndexRequest):
+    added = keyword_index.add(request.stock_id, request.texts)
+    return {"stock_id": request.stock_id, "added": added}
+
+
+@app.get("/keywords/{stock_id}")
+def get_keywords(stock_id: str, window: str = "1h", top_n: int = 10):
+    """종목별 최근 창(1h, 1d)의 상위 키워드 — 히스토리 재스캔 없이 인덱스에서 바로 조회."""
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {list(WINDOWS)}")
+    top = keyword_index.top_keywords(stock_id, window=window, top_n=top_n)
+    return {
+        "stock_id": stock_id,
+        "window": window,
+        "keywords": [{"keyword": word, "count": count} for word, count in top],
+    }
+
+
+@app.get("/sentiment/{stock_id}/history")
+def get_sentiment_history(
+    stock_id: str,
+    granularity: str = "1h",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    top_n: int = 3,
+):
+    """
+    종목 감정 시계열 — 미리 쌓아 둔 롤업 행만 읽는다 (게시글 재채점 없음).
+    기본 구간은 최근 7일.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=400, detail=f"granularity must be one of {list(GRANULARITIES)}"
+        )
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(days=7)
+    points = sentiment_history.series(stock_id, granularity, since, until, top_n=top_n)
+    if points is None:
+        raise HTTPException(status_code=503, detail="DATABASE_URL not set")
+    return {"stock_id": stock_id, "granularity": granularity, "points": points}
+
+
+@app.get("/stats")
+def stats():
+    return {
+        "lexicon_version": analyzer.lexicon_version,
+        "cache": score_cache.stats() if score_cache else None,
+        "keyword_index": keyword_index.stats(),
+        "feature_store": feature_store.stats(),
+        "image_index": image_index.stats(),
+        "image_hashes": image_hashes.stats(),
+        "analysis_pool": analysis_pool.stats() if analysis_pool else None,
+    }
 
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
@@ -0,0 +1,232 @@
+"""
+감정 분석 핫패스 벤치마크.
+
+재현 가능한 합성 한국어·영어 피드 코퍼스(이모지, ㅋㅋ/ㅠㅠ 같은 자모, 티커 포함)를 크기·길이별로 만들어
+- SentimentAnalyzer.analyze_text (텍스트 1개씩)
+- SentimentAnalyzer.extract_top_keywords (코퍼스 전체 1회)
+- POST /analysis (ASGI 테스트 클라이언트로 앱 전체)
+의 처리량, p50/p99 지연, 최대 메모리(tracemalloc)를 측정해 JSON으로 저장한다.
+커밋 간 결과 파일을 비교하면 사전 변경·리팩터링의 비용이 보인다.
+
+    python benchmark.py --sizes 100,1000,10000 --lengths short,medium,long --out bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+KOREAN_WORDS = [
+    "삼성전자", "하이닉스", "반도체", "실적", "발표", "외국인", "기관", "매수", "매도", "개미",
+    "오늘", "내일", "장", "시초가", "종가", "물타기", "손절", "익절", "존버", "가즈아",
+    "떡상", "떡락", "폭락", "상한가", "하한가", "배당", "공매도", "환율", "금리", "코스피",
+    "코스닥", "나스닥", "진짜", "그냥", "너무", "아직", "드디어", "역시", "다들", "형님들",
+    "회복", "호재", "악재", "불장", "설거지", "한강", "살려줘", "대박", "망했다", "수익",
+]
+KOREAN_ENDINGS = ["네요", "합니다", "ㄷㄷ", "인가요?", "입니다", "했어요", "각", "듯", "!!", "..."]
+ENGLISH_WORDS = [
+    "buy", "sell", "hold", "the", "dip", "moon", "rocket", "earnings", "beat", "miss",
+    "guidance", "short", "squeeze", "calls", "puts", "bagholder", "diamond", "hands", "to",
+    "bullish", "bearish", "rally", "crash", "lol", "yolo", "fed", "rates", "chart", "breakout",
+]
+TICKERS = ["$TSLA", "$NVDA", "$AAPL", "$PLTR", "$SOXL", "TQQQ", "005930", "000660", "HIMS", "IONQ"]
+EMOJI = ["🚀", "📈", "📉", "😭", "🔥", "💎", "🙏", "👍🏻", "🤣", "💸"]
+JAMO = ["ㅋㅋ", "ㅋㅋㅋㅋ", "ㅠㅠ", "ㅜㅜ", "ㅎㅎ", "ㄷㄷ", "ㅅㅂ", "ㅡㅡ"]
+
+# 글 길이별 토큰 수 범위
+LENGTHS = {
+    "short": (3, 8),
+    "medium": (10, 30),
+    "long": (50, 150),
+}
+
+
+def generate_corpus(
+    size: int, length: str = "medium", seed: int = 0, english_ratio: float = 0.3
+) -> list[str]:
+    """같은 (size, length, seed)면 항상 같은 코퍼스."""
+    rng = random.Random(f"{seed}:{size}:{length}")
+    low, high = LENGTHS[length]
+    corpus = []
+    for _ in range(size):
+        english = rng.random() < english_ratio
+        words = ENGLISH_WORDS if english else KOREAN_WORDS
+        tokens = []
+        for _ in range(rng.randint(low, high)):
+            roll = rng.random()
+            if roll < 0.08:
+                tokens.append(rng.choice(TICKERS))
+            elif roll < 0.16:
+                tokens.append(rng.choice(EMOJI))
+            elif roll < 0.26 and not english:
+                tokens.append(rng.choice(JAMO))
+            elif roll < 0.34 and not english:
+                tokens.append(rng.choice(words) + rng.choice(KOREAN_ENDINGS))
+            else:
+                tokens.append(rng.choice(words))
+        corpus.append(" ".join(tokens))
+    return corpus
+
+
+def latency_stats(latencies_s: list[float], items: int) -> dict:
+    latencies_ms = np.asarray(latencies_s) * 1000
+    total = float(np.sum(latencies_s))
+    return {
+        "calls": len(latencies_s),
+        "items": items,
+        "total_s": round(total, 6),
+        "throughput_per_s": round(items / total, 2) if total > 0 else None,
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+    }
+
+
+def peak_memory(fn) -> int:
+    """fn 한 번 실행 중 파이썬 할당 최대치 (바이트). 시간 측정과는 따로 돌린다 (tracemalloc이 느리므로)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_analyze_text(analyzer, corpus: list[str], repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        for text in corpus:
+            started = time.perf_counter()
+            analyzer.analyze_text(text)
+            latencies.append(time.perf_counter() - started)
+    result = latency_stats(latencies, items=len(corpus) * repeat)
+    result["peak_bytes"] = peak_memory(lambda: [analyzer.analyze_text(t) for t in corpus])
+    return result
+
+
+def bench_extract_top_keywords(analyzer, corpus: list[str], repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        analyzer.extract_top_keywords(corpus, top_n=3)
+        latencies.append(time.perf_counter() - started)
+    result = latency_stats(latencies, items=len(corpus) * repeat)
+    result["peak_bytes"] = peak_memory(lambda: analyzer.extract_top_keywords(corpus, top_n=3))
+    return result
+
+
+def bench_endpoint(client, corpus: list[str], repeat: int, batch_size: int) -> dict:
+    batches = [corpus[i : i + batch_size] for i in range(0, len(corpus), batch_size)]
+
+    def post(texts: list[str]):
+        response = client.post("/analysis", json={"texts": texts})
+        response.raise_for_status()
+
+    latencies = []
+    for _ in range(repeat):
+        for batch in batches:
+            started = time.perf_counter()
+            post(batch)
+            latencies.append(time.perf_counter() - started)
+    result = latency_stats(latencies, items=len(corpus) * repeat)
+    result["batch_size"] = batch_size
+    result["peak_bytes"] = peak_memory(lambda: [post(batch) for batch in batches])
+    return result
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--lengths", default=",".join(LENGTHS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--english-ratio", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=500, help="/analysis 요청당 텍스트 수")
+    parser.add_argument(
+        "--cache-mb",
+        type=float,
+        default=0,
+        help="점수 캐시 크기 (기본 0: 캐시 없이 채점 비용만 측정)",
+    )
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (없으면 stdout)")
+    args = parser.parse_args(argv)
+
+    # 앱 import 전에 설정 (캐시 크기, 이미지 저장소는 임시 디렉터리로)
+    os.environ["ANALYSIS_CACHE_MAX_MB"] = str(args.cache_mb)
+    os.environ.setdefault("IMAGE_FEATURE_STORE_DIR", tempfile.mkdtemp(prefix="bench-features-"))
+    from fastapi.testclient import TestClient
+
+    import app as analysis_app
+
+    analyzer = analysis_app.analyzer
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    lengths = [s for s in args.lengths.split(",") if s]
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "lexicon_version": analyzer.lexicon_version,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "config": vars(args),
+        "results": [],
+    }
+    with TestClient(analysis_app.app) as client:
+        for length in lengths:
+            for size in sizes:
+                corpus = generate_corpus(size, length, seed=args.seed, english_ratio=args.english_ratio)
+                if analyzer.cache is not None:
+                    analyzer.cache.clear()
+                entry = {
+                    "size": size,
+                    "length": length,
+                    "avg_chars": round(sum(map(len, corpus)) / size, 1),
+                    "analyze_text": bench_analyze_text(analyzer, corpus, args.repeat),
+                    "extract_top_keywords": bench_extract_top_keywords(
+                        analyzer, corpus, args.repeat
+                    ),
+                    "analysis_endpoint": bench_endpoint(
+                        client, corpus, args.repeat, args.batch_size
+                    ),
+                }
+                report["results"].append(entry)
+                print(
+                    f"[bench] {length:>6} x {size:<6} "
+                    f"analyze_text {entry['analyze_text']['throughput_per_s']}/s, "
+                    f"keywords p50 {entry['extract_top_keywords']['p50_ms']}ms, "
+                    f"/analysis {entry['analysis_endpoint']['throughput_per_s']}/s",
+                    file=sys.stderr,
+                )
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
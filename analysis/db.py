@@ -0,0 +1,51 @@
+# crawler/db.py의 커넥션 풀 헬퍼와 같은 코드. 서비스마다 자기 디렉터리만 COPY해 따로 이미지를
+# 빌드하고 공유 패키지가 없으므로 의도적으로 복사해 둔다 (한쪽을 고치면 다른 쪽도 같이).
+# 여기에는 분석 서비스가 쓰는 풀·커넥션만 두고, 피드 upsert 같은 크롤러 쿼리는 두지 않는다.
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from psycopg2.pool import ThreadedConnectionPool
+
+_pool: ThreadedConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ThreadedConnectionPool | None:
+    """프로세스 전역 커넥션 풀 (최초 사용 시 생성). DATABASE_URL이 없으면 None."""
+    global _pool
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=int(os.getenv("DB_POOL_MAX", "5")),
+                    dsn=database_url,
+                )
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def connection() -> Iterator:
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
@@ -0,0 +1,119 @@
+import os
+import threading
+
+import numpy as np
+
+# 8x8x8 HSV 히스토그램
+FEATURE_DIM = 512
+
+
+class FeatureStore:
+    """
+    이미지 URL -> 히스토그램 특징 벡터 저장소 (디스크 영속).
+    - vectors.f32: float32 벡터를 행 단위로 이어 붙인 파일 (읽기는 np.memmap)
+    - index.txt: 행 번호 순서대로 URL 한 줄씩
+    커뮤니티 이미지 URL은 내용이 바뀌지 않으므로 URL을 키로 쓴다.
+    벡터를 먼저 쓰고 인덱스를 나중에 쓰므로, 중간에 죽어도 인덱스가 없는 행을 가리키지 않는다.
+    """
+
+    def __init__(self, directory: str, dim: int = FEATURE_DIM):
+        self.dim = dim
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._index_path = os.path.join(directory, "index.txt")
+        self._lock = threading.Lock()
+        self._rows: dict[str, int] = {}
+        self._urls: list[str] = []
+        self._count = 0
+        self._mmap: np.memmap | None = None
+        self._load()
+
+    def _load(self) -> None:
+        row_bytes = self.dim * 4
+        n_vectors = (
+            os.path.getsize(self._vectors_path) // row_bytes
+            if os.path.exists(self._vectors_path)
+            else 0
+        )
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding="utf-8") as f:
+                for row, line in enumerate(f):
+                    if row >= n_vectors:
+                        break
+                    url = line.rstrip("\n")
+                    self._rows[url] = row
+                    self._urls.append(url)
+                    self._count = row + 1
+        # 인덱스보다 길게 남은 벡터(쓰다 만 행)는 잘라낸다
+        if n_vectors > self._count:
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(self._count * row_bytes)
+
+    def _vectors(self) -> np.memmap | None:
+        if self._count == 0:
+            return None
+        if self._mmap is None or self._mmap.shape[0] < self._count:
+            self._mmap = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(self._count, self.dim)
+            )
+        return self._mmap
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._rows
+
+    def get_many(self, urls: list[str]) -> dict[str, np.ndarray]:
+        """저장된 URL만 {url: 벡터}로 반환."""
+        with self._lock:
+            vectors = self._vectors()
+            if vectors is None:
+                return {}
+            return {
+                url: np.array(vectors[self._rows[url]])
+                for url in urls
+                if url in self._rows
+            }
+
+    def put_many(self, items: dict[str, np.ndarray]) -> int:
+        """새 URL의 벡터만 추가하고 추가한 개수를 반환."""
+        with self._lock:
+            new = [(url, vec) for url, vec in items.items() if url not in self._rows and "\n" not in url]
+            if not new:
+                return 0
+            block = np.stack([np.asarray(vec, dtype=np.float32).reshape(self.dim) for _, vec in new])
+            with open(self._vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                f.write("".join(url + "\n" for url, _ in new))
+            for url, _ in new:
+                self._rows[url] = self._count
+                self._urls.append(url)
+                self._count += 1
+            return len(new)
+
+    @property
+    def count(self) -> int:
+        """저장된 행 수 (행 번호는 0..count-1, 추가만 되고 바뀌지 않는다)."""
+        return self._count
+
+    def url_at(self, row: int) -> str:
+        return self._urls[row]
+
+    def rows(self, start: int, stop: int | None = None) -> np.ndarray:
+        """행 범위의 벡터 (memmap 뷰). 인덱스 구축 등 대량 읽기용."""
+        with self._lock:
+            vectors = self._vectors()
+            if vectors is None:
+                return np.empty((0, self.dim), dtype=np.float32)
+            return vectors[start:stop]
+
+    def take(self, row_ids: np.ndarray) -> np.ndarray:
+        with self._lock:
+            vectors = self._vectors()
+            # memmap 서브클래스를 거치지 않고 일반 배열 뷰에서 모으는 편이 훨씬 빠르다
+            return np.asarray(vectors).take(row_ids, axis=0)
+
+    def stats(self) -> dict:
+        return {"vectors": self._count, "dim": self.dim}
@@ -0,0 +1,113 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+HASH_BITS = 64
+
+
+def dhash(img) -> int:
+    """
+    difference hash: 9x8 흑백 축소 이미지에서 가로로 이웃한 픽셀의 밝기 비교 64비트.
+    재압축·리사이즈·약한 보정에는 거의 안 바뀌므로 재게시된 스크린샷을 URL이 달라도 같은 이미지로 묶을 수 있다.
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ImageHashIndex:
+    """
+    URL -> dHash 저장소 + 근사 중복 묶기.
+    64비트를 bands개 구간으로 나눠 구간별 버킷에 넣고(banded LSH), 한 구간이라도 같은 후보만
+    해밍 거리로 확인한다. max_distance < bands면 비둘기집 원리로 그 거리 안의 중복은 반드시 후보가 된다.
+    새 URL이 기존 이미지와 max_distance 이내면 그 이미지의 대표 URL(canonical)에 묶인다.
+    path(hash\\turl 한 줄씩, 추가만)에 기록해 재시작 후에도 유지.
+    """
+
+    def __init__(self, path: str | None = None, max_distance: int = 6, bands: int = 8):
+        if max_distance >= bands:
+            raise ValueError("max_distance must be smaller than bands")
+        self.path = path
+        self.max_distance = max_distance
+        self.bands = bands
+        self._band_bits = HASH_BITS // bands
+        self._lock = threading.Lock()
+        self._hashes: dict[str, int] = {}
+        self._canonical: dict[str, str] = {}
+        self._buckets: dict[tuple[int, int], list[str]] = {}
+        self._load()
+
+    @classmethod
+    def from_env(cls, directory: str) -> "ImageHashIndex":
+        os.makedirs(directory, exist_ok=True)
+        return cls(
+            path=os.path.join(directory, "dhash.txt"),
+            max_distance=int(os.getenv("IMAGE_DEDUP_MAX_DISTANCE", "6")),
+        )
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                value, sep, url = line.rstrip("\n").partition("\t")
+                if sep and url:
+                    self._insert(url, int(value, 16))
+
+    def _band_keys(self, value: int):
+        mask = (1 << self._band_bits) - 1
+        for band in range(self.bands):
+            yield band, (value >> (band * self._band_bits)) & mask
+
+    def _insert(self, url: str, value: int) -> str:
+        if url in self._canonical:
+            return self._canonical[url]
+        canonical = url
+        best = self.max_distance + 1
+        for band_key in self._band_keys(value):
+            for other in self._buckets.get(band_key, ()):
+                distance = hamming(value, self._hashes[other])
+                if distance < best:
+                    best, canonical = distance, self._canonical[other]
+        self._hashes[url] = value
+        self._canonical[url] = canonical
+        # 대표 이미지만 버킷에 넣는다 (묶인 이미지는 대표를 통해 찾힌다)
+        if canonical == url:
+            for band_key in self._band_keys(value):
+                self._buckets.setdefault(band_key, []).append(url)
+        return canonical
+
+    def add(self, url: str, value: int) -> str:
+        """해시를 기록하고 대표 URL을 반환 (새 이미지면 url 자신)."""
+        if "\n" in url or "\t" in url:
+            return url
+        with self._lock:
+            if url in self._canonical:
+                return self._canonical[url]
+            canonical = self._insert(url, value)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(f"{value:016x}\t{url}\n")
+            return canonical
+
+    def canonical(self, url: str) -> str:
+        return self._canonical.get(url, url)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._hashes
+
+    def stats(self) -> dict:
+        representatives = sum(1 for url, canonical in self._canonical.items() if url == canonical)
+        return {
+            "images": len(self._hashes),
+            "representatives": representatives,
+            "near_duplicates": len(self._hashes) - representatives,
+            "max_distance": self.max_distance,
+        }
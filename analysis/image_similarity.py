@@ -1,13 +1,99 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
+import httpx
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-import requests
 from io import BytesIO
 from PIL import Image
 
-def download_image(url):
-    response = requests.get(url)
-    img = Image.open(BytesIO(response.content))
+from feature_store import FeatureStore
+from image_hash import ImageHashIndex, dhash
+
+# 동시 다운로드 수 / 요청당 타임아웃(초) / 이미지 최대 크기(바이트)
+DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_DOWNLOAD_CONCURRENCY", "16"))
+DOWNLOAD_TIMEOUT = float(os.getenv("IMAGE_DOWNLOAD_TIMEOUT", "10"))
+MAX_IMAGE_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# 디코딩·히스토그램 계산용 스레드 풀 (OpenCV는 연산 중 GIL을 놓는다)
+_decode_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IMAGE_DECODE_WORKERS", "4")),
+    thread_name_prefix="image-decode",
+)
+
+# 지정되면 디코딩·특징 추출을 이 프로세스 풀(worker_pool.AnalysisPool)에서 실행
+_analysis_pool = None
+
+_http_client: httpx.AsyncClient | None = None
+
+
+class ImageTooLargeError(Exception):
+    pass
+
+
+def http_client() -> httpx.AsyncClient:
+    """이미지 다운로드용 공유 클라이언트 (커넥션 풀 재사용)."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=DOWNLOAD_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=DOWNLOAD_CONCURRENCY * 2),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def use_analysis_pool(pool) -> None:
+    global _analysis_pool
+    _analysis_pool = pool
+
+
+def decode_executor():
+    """프로세스 풀이 떠 있으면 그쪽, 아니면 디코딩용 스레드 풀."""
+    if _analysis_pool is not None and _analysis_pool.executor is not None:
+        return _analysis_pool.executor
+    return _decode_executor
+
+
+async def run_decode(fn, data: bytes):
+    """decode_executor()에서 fn(data) 실행. 고른 프로세스 풀이 그 사이 종료됐으면 스레드 풀에서."""
+    loop = asyncio.get_running_loop()
+    try:
+        future = loop.run_in_executor(decode_executor(), fn, data)
+    except RuntimeError:
+        # 사전 재구성으로 워커를 교체하는 중 (cannot schedule new futures after shutdown)
+        future = loop.run_in_executor(_decode_executor, fn, data)
+    return await future
+
+
+async def download_image_bytes(
+    url: str, timeout: float = DOWNLOAD_TIMEOUT, max_bytes: int = MAX_IMAGE_BYTES
+) -> bytes:
+    async with http_client().stream("GET", url, timeout=timeout) as response:
+        response.raise_for_status()
+        declared = response.headers.get("content-length")
+        if declared and int(declared) > max_bytes:
+            raise ImageTooLargeError(f"{declared} bytes > {max_bytes}")
+        chunks = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            if received > max_bytes:
+                raise ImageTooLargeError(f"more than {max_bytes} bytes")
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def decode_image(data: bytes):
+    img = Image.open(BytesIO(data)).convert("RGB")
     return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
 
 def preprocess_image(img):
@@ -20,20 +106,174 @@ def extract_features(img):
     hist = cv2.normalize(hist, hist).flatten()
     return hist
 
-def find_similar_images(target_image, image_array):
-    target_img = download_image(target_image)
-    target_features = extract_features(preprocess_image(target_img))
+def features_from_bytes(data: bytes):
+    return extract_features(preprocess_image(decode_image(data)))
+
+def features_and_hash_from_bytes(data: bytes):
+    img = decode_image(data)
+    return extract_features(preprocess_image(img)), dhash(img)
+
+
+async def fetch_features(
+    url: str,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    max_bytes: int = MAX_IMAGE_BYTES,
+    hashes: ImageHashIndex | None = None,
+):
+    """
+    다운로드는 비동기로, 디코딩·특징 추출은 run_decode로 decode_executor()에서.
+    hashes가 있으면 같은 디코딩 결과로 dHash도 계산해 근사 중복 인덱스에 기록.
+    """
+    data = await download_image_bytes(url, timeout=timeout, max_bytes=max_bytes)
+    if hashes is None:
+        return await run_decode(features_from_bytes, data)
+    features, value = await run_decode(features_and_hash_from_bytes, data)
+    # 해시 파일 추가 쓰기도 디스크 I/O라 이벤트 루프 밖에서
+    await asyncio.to_thread(hashes.add, url, value)
+    return features
+
+
+async def fetch_many_features(
+    urls: list[str],
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    max_bytes: int = MAX_IMAGE_BYTES,
+    store: FeatureStore | None = None,
+    hashes: ImageHashIndex | None = None,
+) -> list:
+    """
+    URL 순서대로 특징 벡터 반환. 실패한 URL은 None.
+    store가 있으면 저장된 벡터는 다운로드 없이 쓰고, 새로 계산한 벡터는 저장.
+    """
+    # 저장소 읽기·쓰기(memmap 재매핑, 파일 추가)는 이벤트 루프를 막지 않도록 스레드에서
+    cached = await asyncio.to_thread(store.get_many, urls) if store is not None else {}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(url: str):
+        if url in cached:
+            return cached[url]
+        async with semaphore:
+            try:
+                return await fetch_features(
+                    url, timeout=timeout, max_bytes=max_bytes, hashes=hashes
+                )
+            except Exception as e:
+                print(f"Error processing {url}: {str(e)}")
+                return None
+
+    features = await asyncio.gather(*(one(url) for url in urls))
+
+    if store is not None:
+        fresh = {
+            url: vec for url, vec in zip(urls, features) if vec is not None and url not in cached
+        }
+        if fresh:
+            await asyncio.to_thread(store.put_many, fresh)
+    return features
+
+
+async def ingest_features(
+    urls: list[str],
+    store: FeatureStore,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    hashes: ImageHashIndex | None = None,
+) -> dict:
+    """
+    크롤링 시점에 이미지 특징을 미리 계산해 저장 (이미 저장된 URL은 건너뜀).
+    hashes가 있으면 새 이미지 중 기존 이미지의 재게시(dHash 근사 중복) 수도 함께 반환.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    missing = [u for u in urls if u not in store]
+    features = await fetch_many_features(
+        missing, concurrency=concurrency, store=store, hashes=hashes
+    )
+    added = sum(1 for vec in features if vec is not None)
+    result = {"added": added, "cached": len(urls) - len(missing), "failed": len(missing) - added}
+    if hashes is not None:
+        result["near_duplicates"] = sum(
+            1
+            for url, vec in zip(missing, features)
+            if vec is not None and hashes.canonical(url) != url
+        )
+    return result
+
+
+async def fetch_target_features(
+    url: str,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    max_bytes: int = MAX_IMAGE_BYTES,
+    store: FeatureStore | None = None,
+    hashes: ImageHashIndex | None = None,
+):
+    if store is not None:
+        cached = await asyncio.to_thread(store.get_many, [url])
+        if url in cached:
+            return cached[url]
+    features = await fetch_features(url, timeout=timeout, max_bytes=max_bytes, hashes=hashes)
+    if store is not None:
+        await asyncio.to_thread(store.put_many, {url: features})
+    return features
+
+
+def top_k_similar(
+    target: np.ndarray, candidates: np.ndarray, threshold: float = 0.7, top_k: int | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    코사인 유사도를 정규화된 행렬-벡터 곱 한 번으로 계산하고,
+    threshold 초과 중 상위 top_k개의 (인덱스, 유사도)를 유사도 내림차순으로 반환.
+    """
+    if candidates.size == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=np.float32)
+
+    target = target.astype(np.float32, copy=False)
+    norms = np.linalg.norm(candidates, axis=1) * np.linalg.norm(target)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sims = np.where(norms > 0, candidates @ target / norms, 0.0)
+
+    return select_top_k(sims, threshold=threshold, top_k=top_k)
+
+
+def select_top_k(
+    sims: np.ndarray, threshold: float = 0.7, top_k: int | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """threshold 초과 중 상위 top_k개의 (인덱스, 유사도)를 유사도 내림차순으로. top_k가 None이면 전부, 0이면 없음."""
+    if top_k is not None and top_k <= 0:
+        return np.empty(0, dtype=np.intp), sims[:0]
+    idx = np.flatnonzero(sims > threshold)
+    if top_k is not None and top_k < idx.size:
+        # 전체 정렬 대신 상위 k개만 골라낸 뒤 그 안에서만 정렬
+        idx = idx[np.argpartition(-sims[idx], top_k - 1)[:top_k]]
+    idx = idx[np.argsort(-sims[idx], kind="stable")]
+    return idx, sims[idx]
+
 
-    similar_images = []
-    for img_url in image_array:
-        try:
-            img = download_image(img_url)
-            img_features = extract_features(preprocess_image(img))
-            similarity = cosine_similarity(target_features.reshape(1, -1), img_features.reshape(1, -1))[0][0]
-            if similarity > 0.7:
-                similar_images.append({"image": img_url, "similarity": float(similarity)})
-        except Exception as e:
-            print(f"Error processing {img_url}: {str(e)}")
+async def find_similar_images(
+    target_image,
+    image_array,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    max_bytes: int = MAX_IMAGE_BYTES,
+    store: FeatureStore | None = None,
+    threshold: float = 0.7,
+    top_k: int | None = None,
+):
+    # 대상 이미지는 실패하면 비교 자체가 불가능하므로 예외를 그대로 올린다
+    target_features, candidates = await asyncio.gather(
+        fetch_target_features(target_image, timeout=timeout, max_bytes=max_bytes, store=store),
+        fetch_many_features(
+            list(image_array),
+            concurrency=concurrency,
+            timeout=timeout,
+            max_bytes=max_bytes,
+            store=store,
+        ),
+    )
 
-    return sorted(similar_images, key=lambda x: x["similarity"], reverse=True)
+    # 성공한 후보만 (n, 512) 행렬로 쌓아 한 번에 비교
+    urls = [url for url, vec in zip(image_array, candidates) if vec is not None]
+    if not urls:
+        return []
+    matrix = np.stack([vec for vec in candidates if vec is not None]).astype(np.float32, copy=False)
 
+    idx, sims = top_k_similar(target_features, matrix, threshold=threshold, top_k=top_k)
+    return [{"image": urls[i], "similarity": float(sim)} for i, sim in zip(idx, sims)]
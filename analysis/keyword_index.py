@@ -0,0 +1,120 @@
+import hashlib
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Iterable
+
+
+# 조회 가능한 시간 창 (초)
+WINDOWS = {
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+# 버킷 크기 (초). 창 경계는 이 단위로 잘린다
+BUCKET_SECONDS = 60
+
+
+class _Bucket:
+    __slots__ = ("start", "counts", "hashes")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.counts: Counter[str] = Counter()
+        # 이 버킷에서 처음 본 텍스트 해시 (버킷이 만료될 때 중복 판정 목록에서도 제거)
+        self.hashes: list[bytes] = []
+
+
+class _StockKeywords:
+    def __init__(self):
+        self.buckets: deque[_Bucket] = deque()
+        # 창별로 포함된 버킷과 누적 빈도를 따로 유지 → 조회 시 히스토리 재스캔 없음
+        self.window_buckets: dict[str, deque[_Bucket]] = {w: deque() for w in WINDOWS}
+        self.window_totals: dict[str, Counter[str]] = {w: Counter() for w in WINDOWS}
+        self.seen: set[bytes] = set()
+
+
+class KeywordIndex:
+    """
+    종목별 키워드 빈도 인덱스.
+    - 새 피드 텍스트를 들어온 시각의 1분 버킷에 증분으로 더한다
+    - 창(1h, 1d)마다 누적 Counter를 유지하고, 창 밖으로 밀려난 버킷만큼 빼서 슬라이딩
+    - 같은 종목에 같은 텍스트가 다시 들어오면 (재크롤링) 가장 긴 창 안에서는 한 번만 센다
+    """
+
+    def __init__(self, tokenize: Callable[[str], list[str]]):
+        self._tokenize = tokenize
+        self._stocks: dict[str, _StockKeywords] = {}
+        self._lock = threading.Lock()
+        self._retention = max(WINDOWS.values())
+
+    def add(self, stock_id: str, texts: Iterable[str], ts: float | None = None) -> int:
+        """텍스트를 인덱스에 추가하고, 새로 반영된(중복 아닌) 텍스트 수를 반환."""
+        now = time.time() if ts is None else ts
+        start = int(now // BUCKET_SECONDS) * BUCKET_SECONDS
+
+        # 토큰화는 lock 밖에서
+        prepared = []
+        for text in texts:
+            if not text or not isinstance(text, str):
+                continue
+            digest = hashlib.blake2b(text.strip().encode(), digest_size=16).digest()
+            prepared.append((digest, self._tokenize(text)))
+
+        with self._lock:
+            stock = self._stocks.setdefault(stock_id, _StockKeywords())
+            self._expire(stock, now)
+
+            if stock.buckets and stock.buckets[-1].start == start:
+                bucket = stock.buckets[-1]
+            else:
+                bucket = _Bucket(start)
+                stock.buckets.append(bucket)
+                for w in WINDOWS:
+                    stock.window_buckets[w].append(bucket)
+
+            added = 0
+            for digest, tokens in prepared:
+                if digest in stock.seen:
+                    continue
+                stock.seen.add(digest)
+                bucket.hashes.append(digest)
+                bucket.counts.update(tokens)
+                for w in WINDOWS:
+                    stock.window_totals[w].update(tokens)
+                added += 1
+            return added
+
+    def top_keywords(
+        self, stock_id: str, window: str = "1h", top_n: int = 10, now: float | None = None
+    ) -> list[tuple[str, int]]:
+        if window not in WINDOWS:
+            raise ValueError(f"unknown window: {window}")
+        with self._lock:
+            stock = self._stocks.get(stock_id)
+            if stock is None:
+                return []
+            self._expire(stock, time.time() if now is None else now)
+            return stock.window_totals[window].most_common(top_n)
+
+    def _expire(self, stock: _StockKeywords, now: float) -> None:
+        for w, length in WINDOWS.items():
+            buckets = stock.window_buckets[w]
+            totals = stock.window_totals[w]
+            while buckets and buckets[0].start + BUCKET_SECONDS <= now - length:
+                for word, count in buckets.popleft().counts.items():
+                    remaining = totals[word] - count
+                    if remaining > 0:
+                        totals[word] = remaining
+                    else:
+                        del totals[word]
+
+        while stock.buckets and stock.buckets[0].start + BUCKET_SECONDS <= now - self._retention:
+            stock.seen.difference_update(stock.buckets.popleft().hashes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "stocks": len(self._stocks),
+                "buckets": sum(len(s.buckets) for s in self._stocks.values()),
+            }
@@ -0,0 +1,83 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+
+# OrderedDict 노드·해시 테이블 슬롯 등 항목당 고정 오버헤드 (대략치)
+_ENTRY_OVERHEAD_BYTES = 100
+
+
+class ScoreCache:
+    """
+    정규화된 텍스트 해시 -> 룰 기반 점수 LRU 캐시.
+    - 키: (사전 버전, preprocess_text 결과)의 blake2b 해시 → 사전이 바뀌면 자동으로 무효화
+    - max_bytes를 넘으면 가장 오래 안 쓴 항목부터 제거
+    - /analysis는 스레드풀에서 돌기 때문에 lock으로 보호
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[bytes, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(lexicon_version: str, normalized_text: str) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(lexicon_version.encode())
+        h.update(b"\0")
+        h.update(normalized_text.encode())
+        return h.digest()
+
+    @staticmethod
+    def _entry_size(key: bytes, value: float) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(value) + _ENTRY_OVERHEAD_BYTES
+
+    def get(self, key: bytes) -> float | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: float) -> None:
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old_value = self._data.get(key)
+            if old_value is not None:
+                # 덮어쓸 때는 이전 값 크기를 빼야 int/float가 섞여도 바이트 합이 어긋나지 않는다
+                self._data.move_to_end(key)
+                size -= self._entry_size(key, old_value)
+            self._data[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_value = self._data.popitem(last=False)
+                self._bytes -= self._entry_size(old_key, old_value)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -1,5 +1,11 @@
+import hashlib
+import json
 import re
-from collections import Counter
+from collections import Counter, deque
+
+import numpy as np
+
+from result_cache import ScoreCache
 
 
 # 키워드 추출 시 제외할 조사·대명사·흔한 단어 (의미 있는 키워드만 남기기 위함)
@@ -79,8 +85,109 @@ STOPWORDS = {
 }
 
 
+# 한글·영문·숫자 연속만 키워드 토큰으로 (2자 이상)
+KEYWORD_TOKEN_RE = re.compile(r"[가-힣a-zA-Z0-9]{2,}")
+
+# 감정 사전 카테고리 (비트마스크 순서와 동일)
+EMOTION_CATEGORIES = ("positive", "negative", "very_negative", "swear_words")
+
+
+class EmotionMatcher:
+    """
+    감정 사전 전체를 Aho-Corasick 오토마톤으로 한 번 컴파일해 두고,
+    텍스트를 한 번만 훑어서 모든 카테고리의 매칭 단어를 찾는다.
+    사전 크기가 커져도 검색 비용은 텍스트 길이에만 비례.
+    """
+
+    def __init__(self, emotion_dict: dict[str, list[str]]):
+        # 노드별 전이 / 실패 링크 / 카테고리 비트마스크 / 출력 단어
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._mask: list[int] = [0]
+        self._out: list[tuple[str, ...]] = [()]
+
+        for bit, key in enumerate(EMOTION_CATEGORIES):
+            for term in emotion_dict.get(key, []):
+                self._add(term.lower(), 1 << bit)
+        self._build_failure_links()
+
+        # 단어 -> 카테고리 비트마스크 (매칭 결과를 카테고리별로 나눌 때 사용)
+        self._term_mask: dict[str, int] = {}
+        for bit, key in enumerate(EMOTION_CATEGORIES):
+            for term in emotion_dict.get(key, []):
+                t = term.lower()
+                self._term_mask[t] = self._term_mask.get(t, 0) | (1 << bit)
+
+    def _add(self, term: str, bit: int) -> None:
+        if not term:
+            return
+        node = 0
+        for ch in term:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._mask.append(0)
+                self._out.append(())
+            node = nxt
+        self._mask[node] |= bit
+        if term not in self._out[node]:
+            self._out[node] = self._out[node] + (term,)
+
+    def _build_failure_links(self) -> None:
+        # BFS로 실패 링크를 채우고, 실패 노드의 출력/마스크를 미리 합쳐 둔다
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                fail_to = self._goto[f].get(ch, 0)
+                self._fail[nxt] = fail_to if fail_to != nxt else 0
+                self._mask[nxt] |= self._mask[self._fail[nxt]]
+                self._out[nxt] = self._out[nxt] + tuple(
+                    t for t in self._out[self._fail[nxt]] if t not in self._out[nxt]
+                )
+
+    def _walk(self, text: str):
+        goto, fail = self._goto, self._fail
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            yield node
+
+    def category_mask(self, text: str) -> int:
+        """텍스트에 등장한 감정 카테고리 비트마스크 (EMOTION_CATEGORIES 순서)."""
+        mask = self._mask
+        found = 0
+        for node in self._walk(text):
+            found |= mask[node]
+        return found
+
+    def find_terms(self, text: str) -> dict[str, list[str]]:
+        """카테고리별로 텍스트에 등장한 사전 단어 목록 (등장 순서, 중복 제거)."""
+        seen: set[str] = set()
+        matched: dict[str, list[str]] = {key: [] for key in EMOTION_CATEGORIES}
+        out = self._out
+        for node in self._walk(text):
+            for term in out[node]:
+                if term in seen:
+                    continue
+                seen.add(term)
+                for bit, key in enumerate(EMOTION_CATEGORIES):
+                    if self._term_mask[term] & (1 << bit):
+                        matched[key].append(term)
+        return matched
+
+
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, cache: ScoreCache | None = None, pool=None):
         # 감정 사전 정의 (가볍고 빠른 룰 기반 분석에 사용)
         self.EMOTION_DICT = {
             'positive': [
@@ -117,19 +224,51 @@ class SentimentAnalyzer:
             4: "긍정"
         }
 
+        # 감정 사전을 한 번만 컴파일 (텍스트당 단일 패스 매칭)
+        self.emotion_matcher = EmotionMatcher(self.EMOTION_DICT)
+        self.lexicon_version = self._compute_lexicon_version()
+        self._keyword_exclude = self._build_keyword_exclude()
+
+        # 정규화 텍스트 -> 점수 캐시 (None이면 캐시 없이 매번 계산)
+        self.cache = cache
+        # 큰 배치를 나눠 처리할 프로세스 풀 (worker_pool.AnalysisPool, None이면 요청 스레드에서 처리)
+        self.pool = pool
+
     def preprocess_text(self, text):
         text = text.lower()
         text = re.sub(r'\s+', ' ', text)
         return text.strip()
 
+    def rebuild_emotion_matcher(self) -> None:
+        """
+        EMOTION_DICT를 수정한 뒤 호출하면 매칭 오토마톤·키워드 제외 목록을 다시 만든다.
+        워커 교체는 백그라운드 스레드에서 하므로 요청 처리 중에 불러도 이벤트 루프를 막지 않는다.
+        """
+        self.emotion_matcher = EmotionMatcher(self.EMOTION_DICT)
+        self.lexicon_version = self._compute_lexicon_version()
+        self._keyword_exclude = self._build_keyword_exclude()
+        # 워커는 시작 시 받은 사전을 들고 있으므로 새 사전으로 다시 띄운다
+        if self.pool is not None and self.pool.executor is not None:
+            self.pool.restart(self.EMOTION_DICT)
+
+    def _compute_lexicon_version(self) -> str:
+        # 사전 내용 해시 — 캐시 키에 포함되어 사전 변경 시 이전 결과를 재사용하지 않음
+        payload = json.dumps(self.EMOTION_DICT, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
     def extract_emotion_features(self, text):
         text = self.preprocess_text(text)
-        has_positive = any(em in text for em in self.EMOTION_DICT['positive'])
-        has_negative = any(em in text for em in self.EMOTION_DICT['negative'])
-        has_very_negative = any(em in text for em in self.EMOTION_DICT['very_negative'])
-        has_swear = any(em in text for em in self.EMOTION_DICT['swear_words'])
+        mask = self.emotion_matcher.category_mask(text)
+        has_positive = bool(mask & 1)
+        has_negative = bool(mask & 2)
+        has_very_negative = bool(mask & 4)
+        has_swear = bool(mask & 8)
         return has_positive, has_negative, has_very_negative, has_swear
 
+    def match_emotion_terms(self, text: str) -> dict[str, list[str]]:
+        """텍스트에서 매칭된 감정 사전 단어를 카테고리별로 반환."""
+        return self.emotion_matcher.find_terms(self.preprocess_text(text))
+
     def _score_with_rules(self, text: str) -> float:
         """
         BERT 대신 가벼운 룰 기반 점수 계산.
@@ -163,6 +302,20 @@ class SentimentAnalyzer:
         # 0~100 범위로 클램프
         return max(0.0, min(100.0, score))
 
+    def _score_text(self, text: str) -> float:
+        """
+        캐시를 거치는 _score_with_rules.
+        룰 점수는 preprocess_text 결과에만 의존하므로 정규화 텍스트를 키로 사용.
+        """
+        if self.cache is None:
+            return self._score_with_rules(text)
+        key = ScoreCache.make_key(self.lexicon_version, self.preprocess_text(text))
+        score = self.cache.get(key)
+        if score is None:
+            score = self._score_with_rules(text)
+            self.cache.put(key, score)
+        return score
+
     def _class_probabilities_from_score(self, base_score: float) -> dict:
         """
         단일 점수에서 5개 클래스 확률을 대략적으로 생성.
@@ -187,7 +340,7 @@ class SentimentAnalyzer:
 
     def analyze_text(self, text):
         try:
-            base_score = self._score_with_rules(text)
+            base_score = self._score_text(text)
 
             # 감정 분류
             if base_score >= 75:
@@ -212,12 +365,209 @@ class SentimentAnalyzer:
 
         except Exception as e:
             print(f"Error processing text: {str(e)}")
+            # analyze_batch의 실패 행과 같은 형태 (중립 점수 기준 확률 포함)
             return {
                 'score': 50.0,
                 'label': "중립",
-                'confidence': "낮음"
+                'confidence': "낮음",
+                'class_probabilities': self._class_probabilities_from_score(50.0),
             }
 
+    def analyze_batch(self, texts: list[str]) -> dict:
+        """
+        여러 텍스트를 한 번에 분석해 컬럼 형태로 반환.
+        룰 매칭만 텍스트별로 하고, 라벨·신뢰도·5클래스 확률은 NumPy 배열 연산으로 계산.
+
+        반환: {"score": [...], "label": [...], "confidence": [...],
+               "class_probabilities": {라벨: [...]}}
+        """
+        scores, label_idx, failed = self._score_batch(texts)
+        return self._build_columns(scores, label_idx, failed)
+
+    def analyze_and_summarize(
+        self, texts: list[str], include_columns: bool = True
+    ) -> tuple[dict | None, dict]:
+        """
+        analyze_batch와 같은 채점 결과로 전체 요약까지 한 번에 계산.
+        include_columns=False면 텍스트별 컬럼은 만들지 않고 요약만 반환.
+        """
+        accumulator = SentimentAccumulator(self)
+        accumulator.add(texts)
+        return accumulator.finish(include_columns=include_columns)
+
+    def _score_texts_inline(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        n = len(texts)
+        scores = np.full(n, 50.0)
+        failed = np.zeros(n, dtype=bool)
+        for i, text in enumerate(texts):
+            try:
+                scores[i] = self._score_text(text)
+            except Exception as e:
+                print(f"Error processing text: {str(e)}")
+                failed[i] = True
+        return scores, failed
+
+    def _score_on_workers(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        # 워커가 교체 중이면 이 스레드에서 채점
+        result = self.pool.score(texts)
+        return result if result is not None else self._score_texts_inline(texts)
+
+    def _score_texts_pooled(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """캐시 조회는 여기서 하고, 캐시에 없는 텍스트만 워커들에 나눠 채점."""
+        if self.cache is None:
+            return self._score_on_workers(texts)
+        n = len(texts)
+        scores = np.full(n, 50.0)
+        failed = np.zeros(n, dtype=bool)
+        keys: list[bytes | None] = [None] * n
+        missing: list[int] = []
+        for i, text in enumerate(texts):
+            try:
+                keys[i] = ScoreCache.make_key(self.lexicon_version, self.preprocess_text(text))
+            except Exception:
+                # 문자열이 아닌 입력 등은 워커에서 실패로 처리되도록 그대로 넘긴다
+                missing.append(i)
+                continue
+            cached = self.cache.get(keys[i])
+            if cached is None:
+                missing.append(i)
+            else:
+                scores[i] = cached
+        if missing:
+            missing_scores, missing_failed = self._score_on_workers([texts[i] for i in missing])
+            scores[missing] = missing_scores
+            failed[missing] = missing_failed
+            for i, score, bad in zip(missing, missing_scores, missing_failed):
+                if keys[i] is not None and not bad:
+                    self.cache.put(keys[i], float(score))
+        return scores, failed
+
+    def _score_batch(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self.pool is not None and self.pool.should_split(len(texts)):
+            scores, failed = self._score_texts_pooled(texts)
+        else:
+            scores, failed = self._score_texts_inline(texts)
+
+        # analyze_text와 같은 경계값으로 라벨 인덱스 계산
+        label_idx = np.select(
+            [scores >= 75, scores >= 55, scores > 45, scores >= 25],
+            [4, 3, 2, 1],
+            default=0,
+        )
+        label_idx[failed] = 2
+        return scores, label_idx, failed
+
+    def _build_columns(
+        self, scores: np.ndarray, label_idx: np.ndarray, failed: np.ndarray
+    ) -> dict:
+        labels = np.array([self.LABEL_MAPPING[i] for i in range(5)], dtype=object)
+
+        confidence = np.where(np.abs(scores - 50) > 20, "높음", "중간").astype(object)
+        confidence[failed] = "낮음"
+
+        probs = self._class_probabilities_batch(scores)
+
+        return {
+            "score": scores.tolist(),
+            "label": labels[label_idx].tolist(),
+            "confidence": confidence.tolist(),
+            "class_probabilities": {
+                self.LABEL_MAPPING[i]: probs[:, i].tolist() for i in range(5)
+            },
+        }
+
+    @staticmethod
+    def sentiment_strength(score: float) -> str:
+        if score >= 75:
+            return "매우 강함"
+        if score >= 55:
+            return "강함"
+        if score > 45:
+            return "보통"
+        if score >= 25:
+            return "약함"
+        return "매우 약함"
+
+    def _summarize(
+        self, scores: np.ndarray, label_idx: np.ndarray, failed: np.ndarray
+    ) -> dict:
+        """
+        전체 감정 요약 (클라이언트 overall_sentiment.korean과 같은 형식).
+        - dominant_sentiment: 가장 많이 나온 라벨
+        - sentiment_distribution: 라벨별 개수·비율 (0개인 라벨 제외)
+        """
+        total = int(scores.size)
+        if total == 0:
+            return {
+                "dominant_sentiment": "중립",
+                "average_score": "50.00",
+                "sentiment_distribution": [],
+                "overall_confidence": "낮음",
+                "sentiment_strength": "보통",
+                "total_analyzed": 0,
+            }
+
+        counts = np.bincount(label_idx, minlength=5)
+        # 긍정 -> 부정 순으로 나열
+        distribution = [
+            {
+                "sentiment": self.LABEL_MAPPING[i],
+                "percentage": f"{counts[i] / total * 100:.2f}",
+                "count": int(counts[i]),
+            }
+            for i in range(4, -1, -1)
+            if counts[i]
+        ]
+        average = float(scores.mean())
+
+        # 실패 비율이 높거나 점수가 중앙에 몰려 있으면 신뢰도를 낮춘다
+        if failed.mean() > 0.5:
+            confidence = "낮음"
+        elif abs(average - 50) > 20:
+            confidence = "높음"
+        else:
+            confidence = "중간"
+
+        return {
+            "dominant_sentiment": self.LABEL_MAPPING[int(counts.argmax())],
+            "average_score": f"{average:.2f}",
+            "sentiment_distribution": distribution,
+            "overall_confidence": confidence,
+            "sentiment_strength": self.sentiment_strength(average),
+            "total_analyzed": total,
+        }
+
+    def _class_probabilities_batch(self, scores: np.ndarray) -> np.ndarray:
+        """_class_probabilities_from_score의 배열 버전. (n, 5) 퍼센트 배열 반환."""
+        target_idx = scores[:, None] / 25.0
+        weights = np.maximum(0.0, 1.5 - np.abs(target_idx - np.arange(5)))
+        total = weights.sum(axis=1, keepdims=True)
+        total[total == 0] = 1.0
+        return np.round(weights / total * 100, 2)
+
+    def _build_keyword_exclude(self) -> set[str]:
+        # 감정 사전에 있는 단어는 키워드 후보에서 제외 (의미 있는 주제어 위주)
+        exclude = set(STOPWORDS)
+        for key in EMOTION_CATEGORIES:
+            exclude.update(self.EMOTION_DICT[key])
+        return exclude
+
+    def tokenize_keywords(self, text: str) -> list[str]:
+        """키워드 후보 토큰 (조사·감정사전·stopword·숫자만 있는 토큰 제외, 소문자)."""
+        if not text or not isinstance(text, str):
+            return []
+        exclude = self._keyword_exclude
+        tokens: list[str] = []
+        for t in KEYWORD_TOKEN_RE.findall(self.preprocess_text(text)):
+            t_lower = t.lower()
+            if t_lower in exclude or t in exclude:
+                continue
+            # 숫자만 있는 토큰 제외
+            if t.isdigit():
+                continue
+            tokens.append(t_lower)
+        return tokens
+
     def extract_top_keywords(self, texts: list[str], top_n: int = 3) -> list[str]:
         """
         피드 텍스트 전체에서 많이 등장한, 의미 있는 키워드 상위 top_n개 반환.
@@ -226,29 +576,53 @@ class SentimentAnalyzer:
         if not texts:
             return []
 
-        # 감정 사전에 있는 단어는 키워드 후보에서 제외 (의미 있는 주제어 위주)
-        exclude = set(STOPWORDS)
-        for key in ("positive", "negative", "very_negative", "swear_words"):
-            exclude.update(self.EMOTION_DICT[key])
+        counter = self.count_keywords(texts)
 
-        # 한글·영문·숫자 연속만 토큰으로 (2자 이상)
-        token_re = re.compile(r"[가-힣a-zA-Z0-9]{2,}")
-        counter: Counter[str] = Counter()
+        # 빈도 내림차순, 동점이면 원문 등장 순서 유지하고 싶으면 그대로 두고 상위 n개
+        top = counter.most_common(top_n)
+        return [word for word, _ in top]
 
+    def _count_keywords_inline(self, texts: list[str]) -> Counter:
+        counter: Counter[str] = Counter()
         for text in texts:
-            if not text or not isinstance(text, str):
-                continue
-            normalized = self.preprocess_text(text)
-            tokens = token_re.findall(normalized)
-            for t in tokens:
-                t_lower = t.lower()
-                if t_lower in exclude or t in exclude:
-                    continue
-                # 숫자만 있는 토큰 제외
-                if t.isdigit():
-                    continue
-                counter[t_lower] += 1
+            counter.update(self.tokenize_keywords(text))
+        return counter
 
-        # 빈도 내림차순, 동점이면 원문 등장 순서 유지하고 싶으면 그대로 두고 상위 n개
-        top = counter.most_common(top_n)
-        return [word for word, _ in top]
\ No newline at end of file
+    def count_keywords(self, texts: list[str]) -> Counter:
+        """텍스트 전체의 키워드 빈도 (큰 배치는 워커들에 나눠 세고 합친다)."""
+        if self.pool is not None and self.pool.should_split(len(texts)):
+            counts = self.pool.count_keywords(texts)
+            if counts is not None:
+                return counts
+        return self._count_keywords_inline(texts)
+
+
+class SentimentAccumulator:
+    """
+    텍스트가 배치로 나눠 들어올 때 (스트리밍 크롤링) 배치마다 바로 채점해 두고,
+    마지막에 전체 컬럼·요약·키워드를 한 번에 만든다.
+    """
+
+    def __init__(self, analyzer: SentimentAnalyzer):
+        self._analyzer = analyzer
+        self._parts: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._keywords: Counter[str] = Counter()
+
+    def add(self, texts: list[str]) -> None:
+        self._parts.append(self._analyzer._score_batch(texts))
+        self._keywords.update(self._analyzer.count_keywords(texts))
+
+    def top_keywords(self, top_n: int = 3) -> list[str]:
+        return [word for word, _ in self._keywords.most_common(top_n)]
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """지금까지 넣은 텍스트 순서대로 (점수, 라벨 인덱스, 실패 여부)."""
+        if self._parts:
+            return tuple(np.concatenate(arrays) for arrays in zip(*self._parts))
+        return np.empty(0), np.empty(0, dtype=int), np.empty(0, dtype=bool)
+
+    def finish(self, include_columns: bool = True) -> tuple[dict | None, dict]:
+        scores, label_idx, failed = self.arrays()
+        analyzer = self._analyzer
+        columns = analyzer._build_columns(scores, label_idx, failed) if include_columns else None
+        return columns, analyzer._summarize(scores, label_idx, failed)
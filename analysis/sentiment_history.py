@@ -0,0 +1,202 @@
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from db import connection, get_pool
+
+# 롤업 단위 (초)
+GRANULARITIES = {
+    "5m": 5 * 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+# 버킷 경계 기준 시간대 (1d 버킷이 한국 시간 자정에 끊기도록)
+BUCKET_TZ = timezone(timedelta(hours=9))
+
+# 버킷마다 남겨 둘 키워드 수 (합칠 때마다 상위만 유지하는 근사 집계)
+ROLLUP_KEYWORDS = 50
+
+LABEL_COUNT = 5
+
+# 처음 채점되는 게시글만 점수를 기록하고 post_id를 돌려준다 → 재크롤링된 글이 롤업에 두 번 들어가지 않음
+UPDATE_SCORES_SQL = """
+UPDATE stock_feeds AS f
+SET sentiment_score = v.score,
+    sentiment_label = v.label,
+    lexicon_version = v.lexicon_version,
+    scored_at = v.scored_at
+FROM (VALUES %s) AS v (post_id, score, label, lexicon_version, scored_at)
+WHERE f.post_id = v.post_id AND f.scored_at IS NULL
+RETURNING f.post_id
+"""
+
+# (종목, 단위, 버킷) 행에 이번 배치를 더한다. 라벨 히스토그램은 원소별 합, 키워드는 합친 뒤 상위만 유지
+UPSERT_ROLLUPS_SQL = f"""
+INSERT INTO sentiment_rollups AS r
+    (stock_id, granularity, bucket_start, post_count, score_sum, label_counts, keyword_counts)
+VALUES %s
+ON CONFLICT (stock_id, granularity, bucket_start) DO UPDATE SET
+    post_count = r.post_count + EXCLUDED.post_count,
+    score_sum = r.score_sum + EXCLUDED.score_sum,
+    label_counts = ARRAY(
+        SELECT a + b FROM unnest(r.label_counts, EXCLUDED.label_counts) AS t (a, b)
+    ),
+    keyword_counts = COALESCE((
+        SELECT jsonb_object_agg(key, total)
+        FROM (
+            SELECT key, SUM(value::int) AS total
+            FROM (
+                SELECT * FROM jsonb_each_text(r.keyword_counts)
+                UNION ALL
+                SELECT * FROM jsonb_each_text(EXCLUDED.keyword_counts)
+            ) AS kv
+            GROUP BY key
+            ORDER BY total DESC
+            LIMIT {ROLLUP_KEYWORDS}
+        ) AS top
+    ), '{{}}'::jsonb)
+"""
+
+SELECT_ROLLUPS_SQL = """
+SELECT bucket_start, post_count, score_sum, label_counts, keyword_counts
+FROM sentiment_rollups
+WHERE stock_id = %s AND granularity = %s AND bucket_start >= %s AND bucket_start < %s
+ORDER BY bucket_start
+"""
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    seconds = GRANULARITIES[granularity]
+    local = ts.astimezone(BUCKET_TZ)
+    offset = local.utcoffset().total_seconds()
+    start = (local.timestamp() + offset) // seconds * seconds - offset
+    return datetime.fromtimestamp(start, BUCKET_TZ)
+
+
+class SentimentHistory:
+    """
+    게시글별 점수를 stock_feeds에 기록하고, 종목별 감정 롤업(5m/1h/1d)을 증분으로 갱신.
+    - 점수는 처음 채점될 때 한 번만 기록 (scored_at IS NULL인 행만)
+    - 새로 기록된 게시글만 채점 시각이 속한 버킷에 더한다 (게시 시각 대신 수집 시각 기준)
+    - 시계열 조회는 롤업 행만 읽으므로 게시글 수와 무관하게 버킷 수만큼의 행만 읽는다
+    DATABASE_URL이 없으면 기록·조회 모두 None.
+    """
+
+    def __init__(self, analyzer):
+        self._analyzer = analyzer
+
+    @staticmethod
+    def enabled() -> bool:
+        return get_pool() is not None
+
+    def _rollup_rows(
+        self,
+        stock_id: str,
+        scored_at: datetime,
+        scores: np.ndarray,
+        label_idx: np.ndarray,
+        texts: list[str],
+    ) -> list[tuple]:
+        label_counts = np.bincount(label_idx, minlength=LABEL_COUNT).tolist()
+        keywords = dict(self._analyzer.count_keywords(texts).most_common(ROLLUP_KEYWORDS))
+        keyword_json = json.dumps(keywords, ensure_ascii=False)
+        return [
+            (
+                stock_id,
+                granularity,
+                bucket_start(scored_at, granularity),
+                int(scores.size),
+                float(scores.sum()),
+                label_counts,
+                keyword_json,
+            )
+            for granularity in GRANULARITIES
+        ]
+
+    def record(
+        self,
+        stock_id: str,
+        post_ids: list[str],
+        texts: list[str],
+        scores: np.ndarray,
+        label_idx: np.ndarray,
+        failed: np.ndarray,
+    ) -> dict | None:
+        """채점 결과를 기록하고 {"scored": 새로 기록한 수, "skipped": 이미 채점된 수} 반환."""
+        if get_pool() is None:
+            return None
+        scored_at = datetime.now(timezone.utc)
+        labels = self._analyzer.LABEL_MAPPING
+        version = self._analyzer.lexicon_version
+        rows = {
+            post_id: (post_id, float(score), labels[int(idx)], version, scored_at)
+            for post_id, score, idx, bad in zip(post_ids, scores, label_idx, failed)
+            if post_id and not bad
+        }
+        if not rows:
+            return {"scored": 0, "skipped": 0}
+
+        with connection() as conn:
+            with conn.cursor() as cursor:
+                updated = execute_values(
+                    cursor,
+                    UPDATE_SCORES_SQL,
+                    list(rows.values()),
+                    template="(%s, %s::real, %s, %s, %s::timestamptz)",
+                    page_size=len(rows),
+                    fetch=True,
+                )
+                new_ids = {post_id for (post_id,) in updated}
+                if new_ids:
+                    keep = [i for i, post_id in enumerate(post_ids) if post_id in new_ids]
+                    # 같은 post_id가 배치에 두 번 있어도 한 번만 더한다
+                    keep = list({post_ids[i]: i for i in keep}.values())
+                    execute_values(
+                        cursor,
+                        UPSERT_ROLLUPS_SQL,
+                        self._rollup_rows(
+                            stock_id,
+                            scored_at,
+                            scores[keep],
+                            label_idx[keep],
+                            [texts[i] for i in keep],
+                        ),
+                        template="(%s, %s, %s, %s, %s, %s::int[], %s::jsonb)",
+                    )
+        return {"scored": len(new_ids), "skipped": len(rows) - len(new_ids)}
+
+    def series(
+        self,
+        stock_id: str,
+        granularity: str,
+        since: datetime,
+        until: datetime,
+        top_n: int = 3,
+    ) -> list[dict] | None:
+        if get_pool() is None:
+            return None
+        with connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(SELECT_ROLLUPS_SQL, (stock_id, granularity, since, until))
+                rows = cursor.fetchall()
+
+        labels = self._analyzer.LABEL_MAPPING
+        points = []
+        for start, count, score_sum, label_counts, keyword_counts in rows:
+            top = sorted(keyword_counts.items(), key=lambda kv: -kv[1])[:top_n]
+            points.append(
+                {
+                    "bucket_start": start.isoformat(),
+                    "count": count,
+                    "average_score": round(score_sum / count, 2) if count else None,
+                    "label_distribution": {
+                        labels[i]: label_counts[i] for i in range(LABEL_COUNT - 1, -1, -1)
+                    },
+                    "top_keywords": [word for word, _ in top],
+                }
+            )
+        return points
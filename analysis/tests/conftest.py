@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 서비스 모듈은 패키지 없이 평평하게 놓여 있으므로 (Dockerfile과 같은 방식) analysis/를 import 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from ann_index import IVFIndex
+from feature_store import FeatureStore
+
+DIM = 8
+
+
+def _store(tmp_path, n: int, seed: int = 0) -> FeatureStore:
+    rng = np.random.default_rng(seed)
+    store = FeatureStore(str(tmp_path / "features"), dim=DIM)
+    store.put_many({f"img-{i}": rng.random(DIM, dtype=np.float32) for i in range(n)})
+    return store
+
+
+@pytest.mark.parametrize("min_train", [1, 2, 4, 15])
+def test_train_with_small_min_train(tmp_path, min_train):
+    store = _store(tmp_path, min_train)
+    index = IVFIndex(store, str(tmp_path / "ivf.npz"), min_train=min_train)
+
+    assert index.sync() == min_train
+    assert index.trained
+    assert index.stats()["nlist"] <= min_train
+
+    query = np.asarray(store.rows(0, 1))[0]
+    results = index.search(query, top_k=1, threshold=0.0, nprobe=min_train)
+    assert results[0][0] == "img-0"
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_incremental_sync_after_training(tmp_path):
+    store = _store(tmp_path, 20)
+    index = IVFIndex(store, str(tmp_path / "ivf.npz"), min_train=4)
+    index.sync()
+
+    rng = np.random.default_rng(1)
+    store.put_many({f"new-{i}": rng.random(DIM, dtype=np.float32) for i in range(5)})
+    assert index.sync() == 5
+    assert index.stats()["indexed"] == 25
+
+    reloaded = IVFIndex(store, str(tmp_path / "ivf.npz"), min_train=4)
+    assert reloaded.trained and reloaded.sync() == 0
+
+
+def test_select_top_k_zero_returns_nothing():
+    from image_similarity import select_top_k
+
+    sims = np.array([0.9, 0.8, 0.95, 0.1], dtype=np.float32)
+    idx, values = select_top_k(sims, threshold=0.5, top_k=0)
+    assert idx.size == 0 and values.size == 0
+    assert select_top_k(sims, threshold=0.5, top_k=None)[0].tolist() == [2, 0, 1]
+    assert select_top_k(sims, threshold=0.5, top_k=2)[0].tolist() == [2, 0]
+
+
+def test_nprobe_must_be_positive():
+    from pydantic import ValidationError
+
+    from app import SimilarImagesRequest
+
+    assert SimilarImagesRequest(target_image="x").nprobe is None
+    assert SimilarImagesRequest(target_image="x", nprobe=1).nprobe == 1
+    for nprobe in (0, -1):
+        with pytest.raises(ValidationError):
+            SimilarImagesRequest(target_image="x", nprobe=nprobe)
+
+
+def test_pending_counts_unindexed_rows(tmp_path):
+    store = _store(tmp_path, 4)
+    index = IVFIndex(store, str(tmp_path / "ivf.npz"), min_train=4)
+    assert index.pending == 4
+    index.sync()
+    assert index.pending == 0
+    store.put_many({"img-new": np.ones(DIM, dtype=np.float32)})
+    assert index.pending == 1
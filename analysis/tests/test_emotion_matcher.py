@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from benchmark import generate_corpus
+from sentiment_analysis import EMOTION_CATEGORIES, EmotionMatcher, SentimentAnalyzer
+
+# 겹치는 단어(접두·접미·포함), 대소문자, 한 글에 여러 카테고리가 섞인 경우
+HANDPICKED = [
+    "한강뷰 아파트 사고 싶다",
+    "한강가자 ㅠㅠ",
+    "한강물 온도 체크",
+    "하... 하.. 흑.. 에휴",
+    "ㅡㅡ 진짜 ㅡ",
+    "ㅅㄲ들 ㅈㄹ하네 개ㅅㄲ",
+    "GAZUA 가즈아 떡상 TO THE MOON 투더문",
+    "BUY BUY 매수 매도",
+    "존버중 존버 대폭락 폭락 폭망",
+    "안돼요 안돼 살려줘 살려",
+    "오 와 굿 👍🏻 👍",
+    "",
+    "     ",
+]
+
+
+def baseline_terms(emotion_dict: dict[str, list[str]], text: str) -> dict[str, set[str]]:
+    """Aho-Corasick 이전의 단어별 부분 문자열 검사 (`em in text`)."""
+    return {key: {em for em in emotion_dict[key] if em and em in text} for key in EMOTION_CATEGORIES}
+
+
+def baseline_mask(emotion_dict: dict[str, list[str]], text: str) -> int:
+    return sum(
+        1 << bit
+        for bit, key in enumerate(EMOTION_CATEGORIES)
+        if any(em in text for em in emotion_dict[key])
+    )
+
+
+def _corpus() -> list[str]:
+    corpus = list(HANDPICKED)
+    for length in ("short", "medium", "long"):
+        corpus += generate_corpus(200, length, seed=7)
+    return corpus
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return SentimentAnalyzer(cache=None)
+
+
+def test_matches_baseline_scan_on_mixed_corpus(analyzer):
+    emotion_dict = analyzer.EMOTION_DICT
+    matcher = analyzer.emotion_matcher
+    for raw in _corpus():
+        text = analyzer.preprocess_text(raw)
+        assert matcher.category_mask(text) == baseline_mask(emotion_dict, text), raw
+        found = {key: set(terms) for key, terms in matcher.find_terms(text).items()}
+        assert found == baseline_terms(emotion_dict, text), raw
+
+
+def test_features_match_baseline(analyzer):
+    emotion_dict = analyzer.EMOTION_DICT
+    for raw in _corpus():
+        text = analyzer.preprocess_text(raw)
+        expected = tuple(any(em in text for em in emotion_dict[key]) for key in EMOTION_CATEGORIES)
+        assert analyzer.extract_emotion_features(raw) == expected, raw
+
+
+def test_random_strings_over_overlapping_alphabet():
+    # 서로 겹치는 짧은 단어들과 그 글자만으로 만든 무작위 문자열 (실패 링크 경로를 많이 탄다)
+    emotion_dict = {
+        "positive": ["ab", "abc", "bca", "c"],
+        "negative": ["bc", "abcab", "cc"],
+        "very_negative": ["aaa", "ab"],
+        "swear_words": ["cab", "bcab"],
+    }
+    matcher = EmotionMatcher(emotion_dict)
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = "".join(rng.choice("abcx") for _ in range(rng.randint(0, 12)))
+        assert matcher.category_mask(text) == baseline_mask(emotion_dict, text), text
+        found = {key: set(terms) for key, terms in matcher.find_terms(text).items()}
+        assert found == baseline_terms(emotion_dict, text), text
+
+
+def test_uppercase_input_is_folded_like_baseline(analyzer):
+    # preprocess_text가 소문자로 바꾸므로 대문자 입력도 같은 단어로 잡힌다
+    matcher = EmotionMatcher({"positive": ["moon"], "negative": [], "very_negative": [], "swear_words": []})
+    analyzer_text = analyzer.preprocess_text("TO THE MOON")
+    assert matcher.find_terms(analyzer_text)["positive"] == ["moon"]
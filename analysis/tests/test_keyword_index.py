@@ -0,0 +1,55 @@
+from keyword_index import BUCKET_SECONDS, WINDOWS, KeywordIndex
+
+HOUR = WINDOWS["1h"]
+DAY = WINDOWS["1d"]
+T0 = 1_700_000_000 // BUCKET_SECONDS * BUCKET_SECONDS  # 버킷 경계에 맞춘 기준 시각
+
+
+def _index() -> KeywordIndex:
+    return KeywordIndex(tokenize=str.split)
+
+
+def test_window_sums():
+    index = _index()
+    index.add("005930", ["반도체 실적", "반도체 수출"], ts=T0)
+    index.add("005930", ["반도체 배당"], ts=T0 + 2 * HOUR)
+
+    now = T0 + 2 * HOUR + 1
+    assert index.top_keywords("005930", "1h", now=now) == [("반도체", 1), ("배당", 1)]
+    assert dict(index.top_keywords("005930", "1d", now=now)) == {
+        "반도체": 3,
+        "실적": 1,
+        "수출": 1,
+        "배당": 1,
+    }
+    assert index.top_keywords("000660", "1h", now=now) == []
+
+
+def test_bucket_at_window_boundary_is_still_counted():
+    index = _index()
+    # 버킷 [T0, T0+60)이 창 [now-1h, now]에 조금이라도 걸쳐 있으면 포함
+    index.add("005930", ["실적"], ts=T0 + BUCKET_SECONDS - 1)
+    last_counted = T0 + BUCKET_SECONDS + HOUR - 1
+    assert index.top_keywords("005930", "1h", now=last_counted) == [("실적", 1)]
+    assert index.top_keywords("005930", "1h", now=last_counted + 1) == []
+    # 1d 창에는 그대로 남아 있다
+    assert index.top_keywords("005930", "1d", now=last_counted + 1) == [("실적", 1)]
+
+
+def test_entry_outside_retention_disappears():
+    index = _index()
+    index.add("005930", ["실적 발표"], ts=T0)
+    expired = T0 + BUCKET_SECONDS + DAY
+    assert index.top_keywords("005930", "1d", now=expired - 1) != []
+    assert index.top_keywords("005930", "1d", now=expired) == []
+
+    # 버킷과 중복 판정 해시도 함께 사라져 같은 글을 다시 센다
+    assert index.stats()["buckets"] == 0
+    assert index.add("005930", ["실적 발표"], ts=expired) == 1
+
+
+def test_repeated_text_is_counted_once_within_retention():
+    index = _index()
+    assert index.add("005930", ["실적 발표", "실적 발표"], ts=T0) == 1
+    assert index.add("005930", ["실적 발표 "], ts=T0 + HOUR) == 0
+    assert index.top_keywords("005930", "1d", now=T0 + HOUR) == [("실적", 1), ("발표", 1)]
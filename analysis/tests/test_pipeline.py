@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+
+import httpx
+import pytest
+
+os.environ.setdefault("IMAGE_FEATURE_STORE_DIR", tempfile.mkdtemp(prefix="test-features-"))
+os.environ.setdefault("ANALYSIS_WORKERS", "0")
+
+import app as analysis_app  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def _crawler(lines: list[dict | str]) -> httpx.AsyncClient:
+    body = "".join(
+        (line if isinstance(line, str) else json.dumps(line, ensure_ascii=False)) + "\n"
+        for line in lines
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=body, headers={"content-type": "application/x-ndjson"})
+
+    return httpx.AsyncClient(base_url="http://crawler", transport=httpx.MockTransport(handler))
+
+
+BATCH = {
+    "type": "batch",
+    "posts": [{"postId": "1", "text": "삼성전자 떡상 가즈아 🚀", "imageSrcs": []}],
+    "saved": None,
+    "duplicates": [],
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(analysis_app, "CRAWLER_URL", "http://crawler")
+    with TestClient(analysis_app.app) as client:
+        yield client
+
+
+def _run(client, monkeypatch, lines):
+    monkeypatch.setattr(analysis_app, "_crawler_client", _crawler(lines))
+    return client.post("/pipeline", json={"stock_id": "005930", "save": False})
+
+
+def test_pipeline_completes_on_done_event(client, monkeypatch):
+    response = _run(client, monkeypatch, [BATCH, {"type": "done", "count": 1}])
+    assert response.status_code == 200
+    assert response.json()["summary"]["total_analyzed"] == 1
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        [BATCH],
+        [BATCH, '{"type": "bat'],
+        [BATCH, {"type": "error", "detail": "browser crashed", "count": 1}],
+    ],
+    ids=["no-done", "truncated", "error"],
+)
+def test_pipeline_fails_when_stream_does_not_finish(client, monkeypatch, lines):
+    assert _run(client, monkeypatch, lines).status_code == 502
+
+
+def test_pipeline_requires_crawler_url(client, monkeypatch):
+    monkeypatch.setattr(analysis_app, "CRAWLER_URL", "")
+    assert client.post("/pipeline", json={"stock_id": "005930"}).status_code == 503
+
+
+def test_lifespan_closes_shared_http_clients(monkeypatch):
+    import image_similarity
+
+    monkeypatch.setattr(analysis_app, "CRAWLER_URL", "http://crawler")
+    with TestClient(analysis_app.app):
+        image_client = image_similarity.http_client()
+        crawler_client = analysis_app.crawler_client()
+    assert image_client.is_closed and crawler_client.is_closed
+    assert image_similarity._http_client is None and analysis_app._crawler_client is None
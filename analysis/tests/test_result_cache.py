@@ -0,0 +1,67 @@
+import sys
+
+from result_cache import ScoreCache
+from sentiment_analysis import SentimentAnalyzer
+
+
+def _key(i: int) -> bytes:
+    return ScoreCache.make_key("v1", f"text-{i}")
+
+
+ENTRY = ScoreCache._entry_size(_key(0), 0.5)
+
+
+def test_evicts_least_recently_used_first():
+    cache = ScoreCache(max_bytes=ENTRY * 3)
+    for i in range(3):
+        cache.put(_key(i), float(i))
+    # 0을 다시 읽으면 가장 오래 안 쓴 항목은 1이 된다
+    assert cache.get(_key(0)) == 0.0
+    cache.put(_key(3), 3.0)
+
+    assert cache.get(_key(1)) is None
+    assert [cache.get(_key(i)) for i in (0, 2, 3)] == [0.0, 2.0, 3.0]
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["evictions"] == 1
+    assert stats["bytes"] == ENTRY * 3 <= stats["max_bytes"]
+
+
+def test_overwrite_keeps_byte_accounting():
+    cache = ScoreCache(max_bytes=ENTRY * 10)
+    cache.put(_key(0), 0.5)
+    cache.put(_key(0), 0.75)
+    assert cache.stats()["bytes"] == ENTRY
+    assert cache.get(_key(0)) == 0.75
+
+    # 크기가 다른 값으로 덮어써도 현재 값 기준으로 맞춰진다
+    cache.put(_key(0), 50)
+    assert cache.stats()["bytes"] == ENTRY - sys.getsizeof(0.5) + sys.getsizeof(50)
+    cache.put(_key(0), 0.25)
+    assert cache.stats()["bytes"] == ENTRY
+    assert cache.stats()["entries"] == 1
+
+
+def test_entry_larger_than_budget_is_not_stored():
+    cache = ScoreCache(max_bytes=ENTRY - 1)
+    cache.put(_key(0), 0.5)
+    assert cache.get(_key(0)) is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_lexicon_change_misses_previous_scores():
+    cache = ScoreCache(max_bytes=1024 * 1024)
+    analyzer = SentimentAnalyzer(cache=cache)
+    text = "가즈아 떡상"
+    first = analyzer._score_text(text)
+    analyzer._score_text(text)
+    assert cache.stats()["hits"] == 1
+
+    old_version = analyzer.lexicon_version
+    analyzer.EMOTION_DICT["very_negative"].append("떡상")
+    analyzer.rebuild_emotion_matcher()
+    assert analyzer.lexicon_version != old_version
+
+    misses = cache.stats()["misses"]
+    second = analyzer._score_text(text)
+    assert cache.stats()["misses"] == misses + 1
+    assert second != first
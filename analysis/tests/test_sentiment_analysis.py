@@ -0,0 +1,107 @@
+import pytest
+
+from sentiment_analysis import SentimentAnalyzer
+
+TEXTS = [
+    "삼성전자 떡상 가즈아 🚀",
+    "오늘 폭락 손절합니다 ㅠㅠ",
+    "BUY THE DIP",
+    "그냥 그래요",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return SentimentAnalyzer(cache=None)
+
+
+def _rows(columns: dict) -> list[dict]:
+    probs = columns["class_probabilities"]
+    return [
+        {
+            "score": columns["score"][i],
+            "label": columns["label"][i],
+            "confidence": columns["confidence"][i],
+            "class_probabilities": {label: values[i] for label, values in probs.items()},
+        }
+        for i in range(len(columns["score"]))
+    ]
+
+
+def test_batch_rows_match_analyze_text(analyzer):
+    rows = _rows(analyzer.analyze_batch(TEXTS))
+    for text, row in zip(TEXTS, rows):
+        expected = analyzer.analyze_text(text)
+        assert row.keys() == expected.keys()
+        assert row["score"] == pytest.approx(expected["score"])
+        assert row["label"] == expected["label"]
+        assert row["confidence"] == expected["confidence"]
+        assert row["class_probabilities"] == pytest.approx(expected["class_probabilities"])
+
+
+def test_failed_row_has_the_same_shape_in_both_paths(analyzer):
+    bad = None  # 문자열이 아니라 채점 중 예외
+    single = analyzer.analyze_text(bad)
+    (row,) = _rows(analyzer.analyze_batch([bad]))
+    assert single["confidence"] == row["confidence"] == "낮음"
+    assert single.keys() == row.keys()
+    assert row["class_probabilities"] == pytest.approx(single["class_probabilities"])
+
+
+def _client_summary(rows: list[dict]) -> dict:
+    """route.ts가 서버로 옮기기 전에 하던 집계 (determineOverallSentiment)."""
+    counts: dict[str, int] = {}
+    for row in rows:
+        counts[row["label"]] = counts.get(row["label"], 0) + 1
+    total = len(rows)
+    average = sum(float(f"{row['score']:.2f}") for row in rows) / total
+    return {
+        "counts": counts,
+        "percentages": {label: f"{count / total * 100:.2f}" for label, count in counts.items()},
+        "average_score": average,
+        "sentiment_strength": SentimentAnalyzer.sentiment_strength(average),
+        "total_analyzed": total,
+    }
+
+
+def test_summary_matches_client_aggregation(analyzer):
+    from benchmark import generate_corpus
+
+    texts = TEXTS + generate_corpus(300, "short", seed=3)
+    columns, summary = analyzer.analyze_and_summarize(texts)
+    expected = _client_summary(_rows(columns))
+
+    distribution = summary["sentiment_distribution"]
+    assert {d["sentiment"]: d["count"] for d in distribution} == expected["counts"]
+    assert {d["sentiment"]: d["percentage"] for d in distribution} == expected["percentages"]
+    assert float(summary["average_score"]) == pytest.approx(expected["average_score"], abs=0.01)
+    assert summary["sentiment_strength"] == expected["sentiment_strength"]
+    assert summary["total_analyzed"] == expected["total_analyzed"] == len(texts)
+    # 가장 많이 나온 라벨 (클라이언트 reduce는 첫 라벨만 돌려주던 버그가 있어 개수로 비교)
+    assert expected["counts"][summary["dominant_sentiment"]] == max(expected["counts"].values())
+
+
+def test_summary_does_not_depend_on_batching(analyzer):
+    from sentiment_analysis import SentimentAccumulator
+
+    _, whole = analyzer.analyze_and_summarize(TEXTS, include_columns=False)
+    accumulator = SentimentAccumulator(analyzer)
+    accumulator.add(TEXTS[:2])
+    accumulator.add(TEXTS[2:])
+    columns, streamed = accumulator.finish(include_columns=False)
+    assert columns is None and streamed == whole
+
+
+def test_empty_summary(analyzer):
+    # 클라이언트는 빈 결과에서 0으로 나눠 NaN이 됐다. 서버는 중립 기본값을 준다
+    columns, summary = analyzer.analyze_and_summarize([])
+    assert columns["score"] == []
+    assert summary == {
+        "dominant_sentiment": "중립",
+        "average_score": "50.00",
+        "sentiment_distribution": [],
+        "overall_confidence": "낮음",
+        "sentiment_strength": "보통",
+        "total_analyzed": 0,
+    }
@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+import sentiment_history
+from sentiment_analysis import SentimentAnalyzer
+from sentiment_history import BUCKET_TZ, GRANULARITIES, SentimentHistory, bucket_start
+
+UTC = timezone.utc
+
+
+def _kst(*args) -> datetime:
+    return datetime(*args, tzinfo=BUCKET_TZ)
+
+
+@pytest.mark.parametrize(
+    "ts, granularity, expected",
+    [
+        # UTC 14:59:59 = KST 23:59:59 → 아직 같은 KST 날짜
+        (datetime(2026, 3, 1, 14, 59, 59, tzinfo=UTC), "1d", _kst(2026, 3, 1)),
+        (datetime(2026, 3, 1, 14, 59, 59, tzinfo=UTC), "1h", _kst(2026, 3, 1, 23)),
+        (datetime(2026, 3, 1, 14, 59, 59, tzinfo=UTC), "5m", _kst(2026, 3, 1, 23, 55)),
+        # UTC 15:00 = KST 자정 → 다음 날 버킷의 시작
+        (datetime(2026, 3, 1, 15, 0, tzinfo=UTC), "1d", _kst(2026, 3, 2)),
+        (datetime(2026, 3, 1, 15, 0, tzinfo=UTC), "1h", _kst(2026, 3, 2, 0)),
+        (datetime(2026, 3, 1, 15, 0, tzinfo=UTC), "5m", _kst(2026, 3, 2, 0, 0)),
+        # UTC 자정은 KST 09시 → UTC 날짜가 바뀌어도 KST 1d 버킷은 그대로
+        (datetime(2026, 3, 2, 0, 0, tzinfo=UTC), "1d", _kst(2026, 3, 2)),
+        (datetime(2026, 3, 1, 23, 59, 59, tzinfo=UTC), "1d", _kst(2026, 3, 2)),
+        # 5m 경계 바로 전·후
+        (datetime(2026, 3, 1, 15, 4, 59, tzinfo=UTC), "5m", _kst(2026, 3, 2, 0, 0)),
+        (datetime(2026, 3, 1, 15, 5, tzinfo=UTC), "5m", _kst(2026, 3, 2, 0, 5)),
+        # 다른 시간대로 들어와도 같은 순간이면 같은 버킷
+        (_kst(2026, 3, 2, 8, 30), "1d", _kst(2026, 3, 2)),
+    ],
+)
+def test_bucket_start_aligns_to_kst(ts, granularity, expected):
+    start = bucket_start(ts, granularity)
+    assert start == expected
+    assert start.utcoffset() == timedelta(hours=9)
+    assert start <= ts < start + timedelta(seconds=GRANULARITIES[granularity])
+
+
+class _Cursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Connection:
+    def cursor(self):
+        return _Cursor()
+
+
+def test_record_rolls_up_only_newly_scored_posts(monkeypatch):
+    calls = []
+
+    @contextmanager
+    def fake_connection():
+        yield _Connection()
+
+    def fake_execute_values(cursor, sql, rows, template=None, page_size=100, fetch=False):
+        calls.append((sql, rows))
+        if sql is sentiment_history.UPDATE_SCORES_SQL:
+            # "2"는 이미 채점된 글 (scored_at IS NOT NULL)
+            return [(row[0],) for row in rows if row[0] != "2"]
+        return None
+
+    monkeypatch.setattr(sentiment_history, "get_pool", lambda: object())
+    monkeypatch.setattr(sentiment_history, "connection", fake_connection)
+    monkeypatch.setattr(sentiment_history, "execute_values", fake_execute_values)
+
+    history = SentimentHistory(SentimentAnalyzer(cache=None))
+    post_ids = ["1", "2", "3", "1", "4"]
+    texts = ["반도체 떡상", "반도체 폭락", "실적 폭락", "반도체 떡상", "실패"]
+    scores = np.array([80.0, 10.0, 20.0, 80.0, 50.0])
+    label_idx = np.array([4, 0, 0, 4, 2])
+    failed = np.array([False, False, False, False, True])
+
+    before = datetime.now(UTC)
+    result = history.record("005930", post_ids, texts, scores, label_idx, failed)
+    after = datetime.now(UTC)
+    # 실패한 "4"는 기록하지 않고, 중복된 "1"은 한 번만
+    assert result == {"scored": 2, "skipped": 1}
+
+    (_, score_rows), (rollup_sql, rollup_rows) = calls
+    assert [row[0] for row in score_rows] == ["1", "2", "3"]
+    assert rollup_sql is sentiment_history.UPSERT_ROLLUPS_SQL
+    assert [row[1] for row in rollup_rows] == list(GRANULARITIES)
+    for stock_id, granularity, start, count, score_sum, label_counts, _ in rollup_rows:
+        assert stock_id == "005930"
+        assert start in {bucket_start(before, granularity), bucket_start(after, granularity)}
+        assert count == 2 and score_sum == 100.0
+        assert label_counts == [1, 0, 0, 0, 1]
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import image_similarity
+from sentiment_analysis import SentimentAnalyzer
+from worker_pool import AnalysisPool
+
+TEXTS = ["삼성전자 떡상 가즈아", "오늘 폭락 손절합니다 ㅠㅠ", "buy the dip 🚀", "그냥 그래요"] * 4
+
+
+@pytest.fixture(scope="module")
+def pooled():
+    pool = AnalysisPool(workers=1, chunk_size=4)
+    analyzer = SentimentAnalyzer(cache=None, pool=pool)
+    pool.start(analyzer.EMOTION_DICT)
+    yield analyzer, pool
+    pool.shutdown()
+
+
+def _inline(analyzer, texts):
+    return analyzer._score_texts_inline(texts)
+
+
+def test_pooled_scores_match_inline(pooled):
+    analyzer, pool = pooled
+    scores = analyzer._score_batch(TEXTS)[0]
+    np.testing.assert_array_equal(scores, _inline(analyzer, TEXTS)[0])
+    assert pool.stats()["chunks"] > 0
+
+
+def test_rebuild_swaps_workers_without_blocking(pooled):
+    analyzer, pool = pooled
+    analyzer.EMOTION_DICT = {
+        **analyzer.EMOTION_DICT,
+        "positive": [*analyzer.EMOTION_DICT["positive"], "그냥"],
+    }
+    analyzer.rebuild_emotion_matcher()
+
+    # 교체 중에는 풀을 쓰지 않고 새 사전으로 바로 채점
+    assert pool.executor is None
+    during = analyzer._score_batch(TEXTS)[0]
+    expected = _inline(analyzer, TEXTS)[0]
+    np.testing.assert_array_equal(during, expected)
+
+    for thread in threading.enumerate():
+        if thread.name == "analysis-pool-restart":
+            thread.join(timeout=120)
+    assert pool.executor is not None
+    chunks = pool.stats()["chunks"]
+    after = analyzer._score_batch(TEXTS)[0]
+    assert pool.stats()["chunks"] > chunks
+    np.testing.assert_array_equal(after, expected)
+
+
+def test_shutdown_discards_pending_restart():
+    pool = AnalysisPool(workers=1, chunk_size=1)
+    analyzer = SentimentAnalyzer(cache=None)
+    pool.start(analyzer.EMOTION_DICT)
+    thread = pool.restart(analyzer.EMOTION_DICT)
+    pool.shutdown()
+    thread.join(timeout=120)
+    assert pool.executor is None
+    assert pool.score(["a", "b"]) is None
+
+
+def test_decode_falls_back_when_process_pool_is_shut_down():
+    # restart가 이전 풀을 막 종료한 순간에 decode_executor()가 그 풀을 돌려준 경우
+    stale = ProcessPoolExecutor(max_workers=1)
+    stale.shutdown()
+    image_similarity.use_analysis_pool(SimpleNamespace(executor=stale))
+    try:
+        assert asyncio.run(image_similarity.run_decode(len, b"abcd")) == 4
+    finally:
+        image_similarity.use_analysis_pool(None)
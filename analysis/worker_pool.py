@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import numpy as np
+
+# 워커 프로세스 안에서만 쓰는 분석기 (initializer에서 한 번 생성)
+_worker_analyzer = None
+
+
+def _init_worker(emotion_dict: dict[str, list[str]]) -> None:
+    """워커 시작 시 부모와 같은 감정 사전으로 분석기·매칭 오토마톤을 한 번만 만든다."""
+    global _worker_analyzer
+    from sentiment_analysis import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer(cache=None)
+    analyzer.EMOTION_DICT = emotion_dict
+    analyzer.rebuild_emotion_matcher()
+    _worker_analyzer = analyzer
+
+
+def _ready() -> bool:
+    return _worker_analyzer is not None
+
+
+def _score_chunk(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    return _worker_analyzer._score_texts_inline(texts)
+
+
+def _keyword_chunk(texts: list[str]) -> Counter:
+    return _worker_analyzer._count_keywords_inline(texts)
+
+
+class AnalysisPool:
+    """
+    CPU 작업(룰 채점·키워드 토큰화·이미지 디코딩)을 위한 프로세스 풀.
+    스레드풀에서는 순수 파이썬 매칭·정규식이 GIL을 두고 경쟁해 큰 배치 하나가 다른 요청을 막으므로,
+    chunk_size보다 큰 배치는 청크로 나눠 워커들에 흩고 결과를 순서대로 합친다 (작은 배치는 IPC 비용이 더 커서 그 자리에서 처리).
+    감정 사전은 initializer로 워커마다 시작 시 한 번만 전달한다.
+    워커는 fork 대신 spawn으로 띄운다 (부모의 스레드·락 상태를 물려받지 않도록).
+    """
+
+    def __init__(self, workers: int, chunk_size: int = 256):
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        # start/restart/shutdown마다 증가 (늦게 끝난 이전 restart가 새 워커를 덮어쓰지 않도록)
+        self._generation = 0
+        self.chunks = 0
+
+    @classmethod
+    def from_env(cls) -> "AnalysisPool | None":
+        """ANALYSIS_WORKERS가 0(기본)이면 None → 모든 작업을 요청 스레드에서 처리."""
+        workers = int(os.getenv("ANALYSIS_WORKERS", "0"))
+        if workers <= 0:
+            return None
+        return cls(workers=workers, chunk_size=int(os.getenv("ANALYSIS_CHUNK_SIZE", "256")))
+
+    @property
+    def executor(self) -> Executor | None:
+        return self._executor
+
+    def _spawn(self, emotion_dict: dict[str, list[str]]) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(emotion_dict,),
+        )
+        # 첫 요청이 워커 기동(임포트·사전 컴파일) 시간을 떠안지 않도록 미리 띄운다
+        for future in [executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        return executor
+
+    def _install(self, executor: ProcessPoolExecutor, generation: int) -> None:
+        with self._lock:
+            current = generation == self._generation
+            if current:
+                previous, self._executor = self._executor, executor
+        if not current:
+            # 그 사이 다시 교체·종료됐으면 이 워커들은 버린다
+            executor.shutdown(wait=False)
+        elif previous is not None:
+            previous.shutdown(wait=False)
+
+    def start(self, emotion_dict: dict[str, list[str]]) -> None:
+        """워커를 띄울 때까지 기다린다 (시작 시 lifespan에서 한 번)."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._install(self._spawn(emotion_dict), generation)
+
+    def restart(self, emotion_dict: dict[str, list[str]]) -> threading.Thread:
+        """
+        새 사전으로 워커를 교체하되 호출한 스레드(이벤트 루프일 수도 있다)를 막지 않는다.
+        기존 워커는 이미 받은 청크만 마저 처리하고 종료하며, 새 워커가 뜰 때까지의 작업은
+        호출 스레드에서 새 사전으로 처리된다 (이전 사전으로 채점한 값이 새 lexicon_version으로 캐시되지 않도록).
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            previous, self._executor = self._executor, None
+        if previous is not None:
+            previous.shutdown(wait=False)
+        thread = threading.Thread(
+            target=lambda: self._install(self._spawn(emotion_dict), generation),
+            name="analysis-pool-restart",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._generation += 1
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def should_split(self, n: int) -> bool:
+        return self._executor is not None and n > self.chunk_size
+
+    def _map(self, fn, texts: list[str]) -> list | None:
+        """워커들에 청크를 나눠 실행. 워커가 교체 중이거나 깨졌으면 None (호출한 쪽에서 직접 처리)."""
+        executor = self._executor
+        if executor is None:
+            return None
+        chunks = [texts[i : i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        try:
+            results = list(executor.map(fn, chunks))
+        except RuntimeError:
+            # 교체 직전에 잡은 executor가 이미 종료됨 (BrokenProcessPool도 여기로)
+            return None
+        self.chunks += len(chunks)
+        return results
+
+    def score(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray] | None:
+        """텍스트 순서대로 (점수, 실패 여부) 배열. 워커를 쓸 수 없으면 None."""
+        parts = self._map(_score_chunk, texts)
+        if parts is None:
+            return None
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def count_keywords(self, texts: list[str]) -> Counter | None:
+        parts = self._map(_keyword_chunk, texts)
+        if parts is None:
+            return None
+        total: Counter[str] = Counter()
+        for counts in parts:
+            total.update(counts)
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "running": self._executor is not None,
+            "chunks": self.chunks,
+        }
@@ -1,11 +1,44 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
 from pathlib import Path
 import os
-from crawler import get_stock_feeds, get_borrow_fee_second_row_html, save_to_db 
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+from crawler import (
+    BORROW_FEE_ROUTE_POLICY,
+    FEED_ROUTE_POLICY,
+    SCROLL_WAIT_TIMEOUT,
+    browser_pool,
+    get_stock_feeds,
+    get_borrow_fee_second_row_html,
+    iter_stock_feeds,
+    latest_post_ids,
+    load_saved_post_ids,
+    save_to_db,
+)
+from db import close_pool
+from dedup import FeedDeduplicator
+from jobs import JobQueue
+from ttl_cache import AsyncTTLCache
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 브라우저는 프로세스 시작 시 한 번 띄우고 요청마다 컨텍스트만 새로 만든다
+    await browser_pool.start()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await browser_pool.stop()
+    close_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 # 로컬: crawler/.env 또는 프로젝트 루트 .env 로드
 load_dotenv(Path(__file__).resolve().parent / ".env")
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
@@ -31,6 +64,34 @@ class CrawlRequest(BaseModel):
     stock_id: str
     max_scrolls: int = 5
     save: bool = True
+    # 이 게시글까지 도달하면 중단하고 그보다 새 게시글만 반환
+    since_post_id: Optional[str] = None
+    # True면 since_post_id 없이도 이 종목의 마지막 수집 지점에서 중단
+    incremental: bool = False
+    # 스크롤 후 다음 배치를 기다리는 최대 시간 (초). None이면 CRAWLER_SCROLL_WAIT_TIMEOUT, 0이면 기다리지 않음
+    scroll_wait_timeout: Optional[float] = Field(None, ge=0)
+    # 지정하면 스크롤 배치마다 바로 흘려보내는 스트리밍 응답 (ndjson 또는 Server-Sent Events)
+    stream: Optional[Literal["ndjson", "sse"]] = None
+    # True면 복붙·재게시 글을 대표 글에 묶어 저장·응답에서 뺀다 (duplicates에 postId → duplicateOf)
+    dedup: bool = True
+
+
+class CrawlBatchRequest(BaseModel):
+    stock_ids: List[str]
+    max_scrolls: int = 5
+    save: bool = True
+    incremental: bool = False
+    scroll_wait_timeout: Optional[float] = Field(None, ge=0)
+    dedup: bool = True
+    # 동시에 크롤링할 종목 수. None이면 CRAWLER_BATCH_CONCURRENCY
+    concurrency: Optional[int] = Field(None, ge=1)
+
+
+# /crawl-batch 기본 동시 크롤링 수 (실제 열린 페이지 수는 브라우저 풀이 한 번 더 제한)
+BATCH_CONCURRENCY = int(os.getenv("CRAWLER_BATCH_CONCURRENCY", "4"))
+
+# 종목별 최근 게시글 기준 근사 중복 탐지 (MinHash LSH)
+feed_deduplicator = FeedDeduplicator.from_env()
 
 
 class CrawlBorrowFeeRequest(BaseModel):
@@ -38,28 +99,247 @@ class CrawlBorrowFeeRequest(BaseModel):
     symbol: str
 
 
+class CrawlBorrowFeeBatchRequest(BaseModel):
+    symbols: List[str]
+
+
+# borrow-fee는 하루 몇 번만 갱신되므로 symbol별로 캐시.
+# TTL이 지나면 stale 값을 바로 주고 백그라운드에서 갱신, 실패(None)는 짧게만 기억
+short_interest_cache = AsyncTTLCache(
+    ttl=float(os.getenv("SHORT_INTEREST_TTL", str(60 * 60))),
+    stale_ttl=float(os.getenv("SHORT_INTEREST_STALE_TTL", str(6 * 60 * 60))),
+    negative_ttl=float(os.getenv("SHORT_INTEREST_NEGATIVE_TTL", "120")),
+    max_entries=int(os.getenv("SHORT_INTEREST_CACHE_MAX_ENTRIES", "1024")),
+)
+
+
+async def get_short_interest(symbol: str) -> tuple[Optional[dict], Optional[float]]:
+    return await short_interest_cache.get(
+        symbol, lambda: get_borrow_fee_second_row_html(symbol=symbol)
+    )
+
+
+async def resolve_since_post_id(
+    stock_id: str, since_post_id: Optional[str], incremental: bool
+) -> Tuple[Optional[str], Optional[List[str]]]:
+    """
+    (since_post_id, known_post_ids) 반환.
+    incremental이면 프로세스 안의 기준점을 쓰고, 없으면 (재시작·다른 워커) stock_feeds에 저장된
+    최근 게시글 id를 읽어 그중 하나라도 만나면 멈춘다 (최신 글이 삭제돼도 전체 크롤링으로 돌아가지 않음).
+    """
+    if since_post_id is not None or not incremental:
+        return since_post_id, None
+    if stock_id in latest_post_ids:
+        return latest_post_ids[stock_id], None
+    known_post_ids = await asyncio.to_thread(load_saved_post_ids, stock_id)
+    if not known_post_ids:
+        return None, None
+    latest_post_ids.setdefault(stock_id, known_post_ids[0])
+    return known_post_ids[0], known_post_ids
+
+
+def resolve_scroll_wait_timeout(scroll_wait_timeout: Optional[float]) -> float:
+    # 0도 유효한 값이므로 None일 때만 기본값
+    return SCROLL_WAIT_TIMEOUT if scroll_wait_timeout is None else scroll_wait_timeout
+
+
+async def stream_crawl_events(request: CrawlRequest) -> AsyncIterator[dict]:
+    """
+    스크롤 배치마다 {"type": "batch", "posts": [...]} 이벤트를 내보내고
+    마지막에 {"type": "done", "count": n} (실패 시 {"type": "error"}).
+    save면 배치 단위로 바로 upsert. dedup이면 중복 글은 posts 대신 duplicates로.
+    """
+    count = 0
+    # 첫 배치의 최신 id는 모든 배치를 저장하고 크롤링이 끝난 뒤에만 기준점으로 반영
+    newest_post_id = None
+    # save=False이거나 DB가 없어 저장되지 않은 배치가 있으면 기준점을 움직이지 않는다
+    all_saved = request.save
+    try:
+        since_post_id, known_post_ids = await resolve_since_post_id(
+            request.stock_id, request.since_post_id, request.incremental
+        )
+        async for batch in iter_stock_feeds(
+            stock_id=request.stock_id,
+            max_scrolls=request.max_scrolls,
+            since_post_id=since_post_id,
+            known_post_ids=known_post_ids,
+            scroll_wait_timeout=resolve_scroll_wait_timeout(request.scroll_wait_timeout),
+        ):
+            if newest_post_id is None:
+                newest_post_id = batch[0]["postId"]
+            duplicates = []
+            if request.dedup:
+                batch, duplicates = await asyncio.to_thread(
+                    feed_deduplicator.filter, request.stock_id, batch
+                )
+            saved = None
+            if request.save and batch:
+                saved = await asyncio.to_thread(
+                    save_to_db, stock_id=request.stock_id, feeds=batch
+                )
+                if saved is None:
+                    all_saved = False
+            count += len(batch)
+            yield {"type": "batch", "posts": batch, "saved": saved, "duplicates": duplicates}
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield {"type": "error", "detail": str(e), "count": count}
+        return
+    if all_saved and newest_post_id is not None:
+        latest_post_ids[request.stock_id] = newest_post_id
+    yield {"type": "done", "count": count, "since_post_id": since_post_id}
+
+
+def encode_ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def encode_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def crawl_stock(
+    stock_id: str,
+    max_scrolls: int = 5,
+    save: bool = True,
+    since_post_id: Optional[str] = None,
+    incremental: bool = False,
+    scroll_wait_timeout: Optional[float] = None,
+    dedup: bool = True,
+) -> dict:
+    since_post_id, known_post_ids = await resolve_since_post_id(
+        stock_id, since_post_id, incremental
+    )
+
+    feeds = await get_stock_feeds(
+        stock_id=stock_id,
+        max_scrolls=max_scrolls,
+        since_post_id=since_post_id,
+        known_post_ids=known_post_ids,
+        scroll_wait_timeout=resolve_scroll_wait_timeout(scroll_wait_timeout),
+    )
+
+    # 중복으로 빠질 수도 있으므로 dedup 전에 기준점 후보를 잡아 둔다
+    newest_post_id = feeds[0]["postId"] if feeds else None
+
+    duplicates = []
+    if dedup and feeds:
+        # 중복 글은 저장·분석 전에 대표 글로 묶어 뺀다
+        feeds, duplicates = await asyncio.to_thread(feed_deduplicator.filter, stock_id, feeds)
+
+    saved = None
+    if save and feeds:
+        # psycopg2는 동기 드라이버라 이벤트 루프를 막지 않도록 스레드에서 실행
+        saved = await asyncio.to_thread(save_to_db, stock_id=stock_id, feeds=feeds)
+
+    # 저장까지 성공한 뒤에만 증분 기준점을 앞으로 (실패하면 다음 증분 크롤링이 같은 글을 다시 수집).
+    # save=False 미리보기나 DATABASE_URL 없이 돈 크롤링은 저장된 글이 없으므로 그대로 둔다
+    if save and saved is not None and newest_post_id is not None:
+        latest_post_ids[stock_id] = newest_post_id
+
+    return {
+        "status": "success",
+        "count": len(feeds),
+        "since_post_id": since_post_id,
+        "saved": saved,
+        "feeds": feeds,
+        "duplicates": duplicates,
+    }
+
+
 @app.post("/crawl")
 async def crawl(request: CrawlRequest):
+    if request.stream:
+        encode = encode_sse if request.stream == "sse" else encode_ndjson
+        media_type = "text/event-stream" if request.stream == "sse" else "application/x-ndjson"
+
+        async def body():
+            async for event in stream_crawl_events(request):
+                yield encode(event)
+
+        return StreamingResponse(body(), media_type=media_type)
+
     try:
-        feeds = await get_stock_feeds(
+        return await crawl_stock(
             stock_id=request.stock_id,
             max_scrolls=request.max_scrolls,
+            save=request.save,
+            since_post_id=request.since_post_id,
+            incremental=request.incremental,
+            scroll_wait_timeout=request.scroll_wait_timeout,
+            dedup=request.dedup,
         )
-
-        if request.save and feeds:
-            save_to_db(stock_id=request.stock_id, feeds=feeds)
-
-        return {
-            "status": "success",
-            "count": len(feeds),
-            "feeds": feeds,
-        }
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# 비동기 크롤링 job 큐 (CRAWLER_JOB_DB를 지정하면 SQLite에 기록해 재시작 후에도 이어서 실행)
+job_queue = JobQueue.from_env(runner=crawl_stock)
+
+
+@app.post("/jobs/crawl", status_code=202)
+async def submit_crawl_job(request: CrawlRequest):
+    """
+    크롤링을 job으로 등록하고 job_id를 바로 반환. 결과는 GET /jobs/{job_id}로 조회.
+    같은 종목·같은 옵션의 job이 이미 대기/실행 중이면 그 job을 돌려준다.
+    """
+    params = request.model_dump(exclude={"stock_id", "stream"})
+    job, deduplicated = await job_queue.submit(request.stock_id, params)
+    return {"job_id": job.id, "status": job.status, "deduplicated": deduplicated}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=30)):
+    """wait초 동안 job 완료를 기다렸다가 반환 (long-poll). 0이면 현재 상태를 바로 반환."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    job = await job_queue.wait(job, timeout=wait)
+    return job.to_dict()
+
+
+@app.post("/crawl-batch")
+async def crawl_batch(request: CrawlBatchRequest):
+    """
+    여러 종목을 동시에 크롤링하고, 끝나는 순서대로 종목별 결과를 NDJSON 한 줄씩 스트리밍.
+    한 종목이 실패해도 나머지는 계속 진행 (해당 줄에 status=error).
+    """
+    stock_ids = list(dict.fromkeys(request.stock_ids))
+    concurrency = BATCH_CONCURRENCY if request.concurrency is None else request.concurrency
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(stock_id: str) -> dict:
+        async with semaphore:
+            try:
+                result = await crawl_stock(
+                    stock_id=stock_id,
+                    max_scrolls=request.max_scrolls,
+                    save=request.save,
+                    incremental=request.incremental,
+                    scroll_wait_timeout=request.scroll_wait_timeout,
+                    dedup=request.dedup,
+                )
+            except Exception as e:
+                print(f"[crawl-batch] error for stock_id={stock_id}: {e}")
+                return {"stock_id": stock_id, "status": "error", "detail": str(e)}
+            return {"stock_id": stock_id, **result}
+
+    async def stream():
+        tasks = [asyncio.create_task(run(stock_id)) for stock_id in stock_ids]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+        finally:
+            # 클라이언트가 연결을 끊으면 남은 크롤링 취소
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @app.post("/crawl-short-interest")
 async def crawl_short_interest(request: CrawlBorrowFeeRequest):
     """
@@ -69,11 +349,12 @@ async def crawl_short_interest(request: CrawlBorrowFeeRequest):
     symbol 예: nyse-hims, nasdaq-aapl
     """
     try:
-        row = await get_borrow_fee_second_row_html(symbol=request.symbol)
+        row, age = await get_short_interest(request.symbol)
         return {
             "status": "success",
             "symbol": request.symbol,
             "row": row,
+            "cache_age": age,
         }
     except Exception as e:
         import traceback
@@ -81,6 +362,37 @@ async def crawl_short_interest(request: CrawlBorrowFeeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/crawl-short-interest-batch")
+async def crawl_short_interest_batch(request: CrawlBorrowFeeBatchRequest):
+    """여러 symbol을 한 번에 조회. 캐시에 없는 symbol만 동시에 크롤링 (동시 페이지 수는 브라우저 풀이 제한)."""
+    symbols = list(dict.fromkeys(request.symbols))
+    results = await asyncio.gather(
+        *(get_short_interest(symbol) for symbol in symbols), return_exceptions=True
+    )
+    rows = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            print(f"[borrow-fee batch] error for symbol={symbol}: {result}")
+            rows[symbol] = None
+        else:
+            rows[symbol] = result[0]
+    return {"status": "success", "rows": rows}
+
+
+@app.get("/stats")
+def stats():
+    return {
+        "browser_pool": browser_pool.stats(),
+        "jobs": job_queue.stats(),
+        "short_interest_cache": short_interest_cache.stats(),
+        "dedup": feed_deduplicator.stats(),
+        "route_policy": {
+            "feed": FEED_ROUTE_POLICY.stats(),
+            "borrow_fee": BORROW_FEE_ROUTE_POLICY.stats(),
+        },
+    }
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
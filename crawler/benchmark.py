@@ -0,0 +1,237 @@
+"""
+크롤러 오프라인 벤치마크.
+
+replay.py의 로컬 대역 서버로 fixture를 제공하고 get_stock_feeds / get_borrow_fee_second_row_html을
+여러 번 돌려 크롤링 한 번당
+- wall time
+- Playwright 프로토콜 호출 수 (드라이버를 거쳐 브라우저로 가는 왕복 ≈ CDP round-trip)
+- 서버가 보낸 바이트·요청 수 (route policy로 차단된 요청은 포함되지 않음)
+- 크롤링 직후 브라우저 프로세스 RSS 합
+를 재서 JSON으로 저장한다. 네트워크 없이 추출·스크롤 전략을 비교할 수 있다.
+
+    python benchmark.py --runs 5 --out crawl-bench.json             # 합성 fixture
+    python benchmark.py --fixtures fixtures --stock-ids 005930       # 녹화한 fixture
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from replay import ReplayServer, write_synthetic_fixtures
+
+
+class ProtocolCallCounter:
+    """Playwright Channel의 송신 메서드를 감싸 프로토콜 호출 수를 센다 (메서드별)."""
+
+    _METHODS = ("send", "send_return_as_dict", "send_no_reply")
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self._originals = {}
+
+    def install(self) -> None:
+        from playwright._impl._connection import Channel
+
+        for name in self._METHODS:
+            original = getattr(Channel, name)
+            self._originals[name] = original
+
+            def wrapper(channel, method, *args, _original=original, **kwargs):
+                self.calls[method] += 1
+                return _original(channel, method, *args, **kwargs)
+
+            setattr(Channel, name, wrapper)
+
+    def uninstall(self) -> None:
+        from playwright._impl._connection import Channel
+
+        for name, original in self._originals.items():
+            setattr(Channel, name, original)
+        self._originals = {}
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def browser_rss_bytes() -> Optional[int]:
+    """이 프로세스의 자손 중 Chromium 프로세스 RSS 합 (Linux /proc 기준, 없으면 None)."""
+    if not os.path.isdir("/proc"):
+        return None
+    total = 0
+    stack = _children(os.getpid())
+    while stack:
+        pid = stack.pop()
+        stack.extend(_children(pid))
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read()
+            if b"chrom" not in cmdline.lower():
+                continue
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+def summarize(samples: List[dict]) -> dict:
+    def column(key):
+        return [s[key] for s in samples if s.get(key) is not None]
+
+    walls = sorted(column("wall_s"))
+    summary = {"runs": len(samples)}
+    if walls:
+        summary.update(
+            {
+                "wall_p50_s": round(statistics.median(walls), 4),
+                "wall_max_s": round(walls[-1], 4),
+                "wall_mean_s": round(statistics.fmean(walls), 4),
+            }
+        )
+    for key in ("protocol_calls", "bytes", "requests", "browser_rss_bytes", "items"):
+        values = column(key)
+        if values:
+            summary[f"{key}_mean"] = round(statistics.fmean(values), 1)
+    return summary
+
+
+async def measure(
+    run: Callable, server: ReplayServer, counter: ProtocolCallCounter, runs: int
+) -> List[dict]:
+    samples = []
+    for _ in range(runs):
+        server.reset_counters()
+        counter.reset()
+        started = time.perf_counter()
+        result = await run()
+        wall = time.perf_counter() - started
+        samples.append(
+            {
+                "wall_s": wall,
+                "protocol_calls": counter.total,
+                "top_methods": dict(counter.calls.most_common(5)),
+                "bytes": server.bytes_sent,
+                "requests": server.requests,
+                "browser_rss_bytes": browser_rss_bytes(),
+                "items": len(result) if isinstance(result, list) else int(result is not None),
+            }
+        )
+    return samples
+
+
+def _fixture_ids(directory: str, prefix: str) -> List[str]:
+    paths = glob.glob(os.path.join(directory, f"{prefix}_*.json"))
+    return sorted(os.path.basename(p)[len(prefix) + 1 : -len(".json")] for p in paths)
+
+
+async def run_benchmark(args, server: ReplayServer) -> dict:
+    from crawler import browser_pool, get_borrow_fee_second_row_html, get_stock_feeds
+
+    counter = ProtocolCallCounter()
+    counter.install()
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "feeds": {},
+        "borrow_fee": {},
+    }
+    try:
+        await browser_pool.start()
+        # 브라우저 기동 비용은 측정에서 뺀다
+        for stock_id in args.stock_ids:
+            samples = await measure(
+                lambda: get_stock_feeds(
+                    stock_id=stock_id,
+                    max_scrolls=args.max_scrolls,
+                    scroll_wait_timeout=args.scroll_wait_timeout,
+                ),
+                server,
+                counter,
+                args.runs,
+            )
+            report["feeds"][stock_id] = {"summary": summarize(samples), "samples": samples}
+            print(f"[bench] feed {stock_id}: {report['feeds'][stock_id]['summary']}", file=sys.stderr)
+        for symbol in args.symbols:
+            samples = await measure(
+                lambda: get_borrow_fee_second_row_html(symbol=symbol), server, counter, args.runs
+            )
+            report["borrow_fee"][symbol] = {"summary": summarize(samples), "samples": samples}
+            print(
+                f"[bench] borrow-fee {symbol}: {report['borrow_fee'][symbol]['summary']}",
+                file=sys.stderr,
+            )
+    finally:
+        await browser_pool.stop()
+        counter.uninstall()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--fixtures", default=None, help="fixture 디렉터리 (없으면 합성 fixture 생성)")
+    parser.add_argument("--stock-ids", default=None, help="쉼표 구분 (기본: fixture 전부)")
+    parser.add_argument("--symbols", default=None, help="쉼표 구분 (기본: fixture 전부)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-scrolls", type=int, default=5)
+    parser.add_argument("--scroll-wait-timeout", type=float, default=2.0)
+    parser.add_argument("--render-delay-ms", type=int, default=100)
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (없으면 stdout)")
+    args = parser.parse_args(argv)
+
+    if args.fixtures is None:
+        args.fixtures = tempfile.mkdtemp(prefix="crawl-fixtures-")
+        write_synthetic_fixtures(args.fixtures)
+    args.stock_ids = (
+        args.stock_ids.split(",") if args.stock_ids else _fixture_ids(args.fixtures, "feed")
+    )
+    args.symbols = (
+        args.symbols.split(",") if args.symbols else _fixture_ids(args.fixtures, "borrow_fee")
+    )
+
+    # crawler는 import 시점에 대상 주소를 읽으므로 대역 서버를 먼저 띄우고 환경 변수를 설정
+    server = ReplayServer(args.fixtures, render_delay_ms=args.render_delay_ms)
+    base_url = server.start()
+    os.environ["CRAWLER_FEED_BASE_URL"] = base_url
+    os.environ["CRAWLER_BORROW_FEE_BASE_URL"] = base_url
+    # 같은 호스트로 반복 요청하므로 도메인 rate limit은 끈다
+    os.environ["CRAWLER_DOMAIN_RPS"] = "0"
+    try:
+        report = asyncio.run(run_benchmark(args, server))
+    finally:
+        server.stop()
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from playwright.async_api import Browser, Page, Playwright, async_playwright
+
+# Cloud Run/Docker: --disable-dev-shm-usage 필수 (작은 /dev/shm)
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--disable-extensions",
+    "--no-first-run",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+]
+
+
+class _PooledBrowser:
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.active = 0
+        self.served = 0
+        # 페이지 제한에 도달 → 새 요청은 받지 않고, 진행 중 페이지가 끝나면 종료
+        self.retiring = False
+
+
+class BrowserPool:
+    """
+    오래 살아 있는 Chromium 브라우저 풀.
+    - 요청마다 브라우저를 띄우지 않고, 새 BrowserContext(쿠키·스토리지 격리)만 만든다
+    - max_concurrency로 동시에 열린 페이지 수를 제한
+    - 브라우저당 max_pages_per_browser 페이지를 처리하면 교체 (메모리 누수 방지)
+    - 크래시로 연결이 끊긴 브라우저는 다음 요청 때 다시 띄운다
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        max_concurrency: int = 4,
+        max_pages_per_browser: int = 50,
+    ):
+        self.size = max(1, size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pages_per_browser = max(1, max_pages_per_browser)
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[_PooledBrowser] = []
+        self._draining: List[_PooledBrowser] = []
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @classmethod
+    def from_env(cls) -> "BrowserPool":
+        return cls(
+            size=int(os.getenv("CRAWLER_BROWSERS", "1")),
+            max_concurrency=int(os.getenv("CRAWLER_MAX_CONCURRENCY", "4")),
+            max_pages_per_browser=int(os.getenv("CRAWLER_PAGES_PER_BROWSER", "50")),
+        )
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._playwright is not None:
+                return
+            self._playwright = await async_playwright().start()
+            self._browsers = [await self._launch() for _ in range(self.size)]
+
+    async def stop(self) -> None:
+        async with self._lock:
+            for pb in self._browsers + self._draining:
+                await self._close(pb)
+            self._browsers = []
+            self._draining = []
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def _launch(self) -> _PooledBrowser:
+        browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        return _PooledBrowser(browser)
+
+    @staticmethod
+    async def _close(pb: _PooledBrowser) -> None:
+        try:
+            await pb.browser.close()
+        except Exception as e:
+            print(f"[browser-pool] close failed: {e}")
+
+    async def _checkout(self) -> _PooledBrowser:
+        # 앱 lifespan 밖(스크립트 등)에서 호출돼도 동작하도록 지연 시작
+        if self._playwright is None:
+            await self.start()
+
+        async with self._lock:
+            for i, pb in enumerate(self._browsers):
+                crashed = not pb.browser.is_connected()
+                if not (crashed or pb.retiring):
+                    continue
+                if crashed:
+                    print("[browser-pool] browser disconnected, relaunching")
+                if pb.active and not crashed:
+                    # 진행 중인 페이지가 끝나면 _release에서 종료
+                    self._draining.append(pb)
+                else:
+                    await self._close(pb)
+                self._browsers[i] = await self._launch()
+
+            pb = min(self._browsers, key=lambda b: b.active)
+            pb.active += 1
+            pb.served += 1
+            if pb.served >= self.max_pages_per_browser:
+                pb.retiring = True
+            return pb
+
+    async def _release(self, pb: _PooledBrowser) -> None:
+        async with self._lock:
+            pb.active -= 1
+            if pb.active == 0 and pb in self._draining:
+                self._draining.remove(pb)
+                await self._close(pb)
+
+    @asynccontextmanager
+    async def page(self, **context_options) -> AsyncIterator[Page]:
+        """격리된 새 컨텍스트의 페이지를 빌려준다. 블록을 벗어나면 컨텍스트는 닫힌다."""
+        async with self._semaphore:
+            pb = await self._checkout()
+            context = None
+            try:
+                context = await pb.browser.new_context(**context_options)
+                yield await context.new_page()
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        print(f"[browser-pool] context close failed: {e}")
+                await self._release(pb)
+
+    def stats(self) -> dict:
+        return {
+            "browsers": len(self._browsers),
+            "draining": len(self._draining),
+            "active_pages": sum(pb.active for pb in self._browsers + self._draining),
+            "pages_served": [pb.served for pb in self._browsers],
+            "max_concurrency": self.max_concurrency,
+        }
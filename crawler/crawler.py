@@ -1,105 +1,186 @@
-from playwright.async_api import async_playwright
 from playwright._impl._errors import TimeoutError as PlaywrightTimeoutError
-from typing import List, Dict
-import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
 import os
 
-import psycopg2
-
-DATABASE_URL = os.environ.get("DATABASE_URL")
-
-
-async def get_stock_feeds(stock_id: str, max_scrolls: int = 5) -> List[Dict]:
-    url = f"https://tossinvest.com/stocks/{stock_id}/community?feedSortType=RECENT"
-
-    async with async_playwright() as p:
-        # Cloud Run/Docker: --disable-dev-shm-usage 필수 (작은 /dev/shm)
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-                "--disable-software-rasterizer",
-                "--disable-extensions",
-                "--no-first-run",
-                "--disable-background-networking",
-                "--disable-default-apps",
-                "--disable-sync",
-                "--mute-audio",
-            ],
-        )
+from browser_pool import BrowserPool
+from db import get_pool, select_saved_post_ids, upsert_feeds
+from rate_limit import DomainRateLimiter
+from route_policy import RoutePolicy, env_list
+
+# 프로세스 전역 브라우저 풀 (app.py lifespan에서 start/stop)
+browser_pool = BrowserPool.from_env()
+
+# 사이트별 페이지 로드 간격 제한 (여러 종목 동시 크롤링 시)
+domain_limiter = DomainRateLimiter.from_env()
+
+# 종목별 마지막으로 수집한 최신 게시글 id (증분 크롤링의 자동 기준점).
+# 크롤링이 끝나고 저장까지 성공한 뒤에만 app.py에서 갱신한다
+latest_post_ids: Dict[str, str] = {}
+
+# 재시작 직후·다른 워커에서 증분 기준점으로 DB에서 읽어 올 최근 게시글 수
+INCREMENTAL_KNOWN_IDS = int(os.getenv("CRAWLER_INCREMENTAL_KNOWN_IDS", "100"))
+
+FEED_CONTEXT_OPTIONS = dict(
+    locale="ko-KR",
+    timezone_id="Asia/Seoul",
+    viewport={"width": 1280, "height": 900},
+    user_agent=(
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/122.0.0.0 Safari/537.36"
+    ),
+)
+
+# 대상 사이트별 요청 차단 정책 (허용 도메인은 CRAWLER_*_ALLOW_DOMAINS로 제한 가능)
+FEED_ROUTE_POLICY = RoutePolicy.from_env(
+    allow_domains=env_list("CRAWLER_FEED_ALLOW_DOMAINS"),
+)
+BORROW_FEE_ROUTE_POLICY = RoutePolicy.from_env(
+    allow_domains=env_list("CRAWLER_BORROW_FEE_ALLOW_DOMAINS"),
+)
+
+# 대상 사이트 주소. replay.py의 로컬 대역 서버로 돌릴 때만 바꾼다 (오프라인 재현·벤치마크)
+FEED_BASE_URL = os.getenv("CRAWLER_FEED_BASE_URL", "https://tossinvest.com").rstrip("/")
+BORROW_FEE_BASE_URL = os.getenv(
+    "CRAWLER_BORROW_FEE_BASE_URL", "https://chartexchange.com"
+).rstrip("/")
+
+POST_SELECTOR = '[data-section-name="커뮤니티__게시글"]'
+
+# 커뮤니티 게시글에서 아직 반환하지 않은 것만 {postId, text, imageSrcs}로 모아 반환하고,
+# scroll이면 맨 아래로 스크롤. 반환한 id는 window에 기억해 두므로 다음 호출에서 다시 보내지 않는다.
+EXTRACT_NEW_POSTS_AND_SCROLL_JS = """
+(scroll) => {
+  const seen = (window.__tulipSeenPostIds ||= new Set());
+  const posts = [];
+  for (const post of document.querySelectorAll('[data-section-name="커뮤니티__게시글"]')) {
+    const postId = post.getAttribute('data-post-anchor-id');
+    if (!postId || seen.has(postId)) continue;
+    seen.add(postId);
+
+    const textEl = post.querySelector('span._1xixuox1');
+    let text = textEl ? textEl.innerText.trim() : '';
+    if (!text) {
+      text = Array.from(post.innerText.trim()).slice(0, 2000).join('');
+    }
+
+    const imageSrcs = [];
+    for (const img of post.querySelectorAll('ul[data-list-name="EditorImageList"] img')) {
+      const src = img.getAttribute('src');
+      if (src) imageSrcs.push(src);
+    }
+
+    posts.push({ postId, text, imageSrcs });
+  }
+  if (scroll) window.scrollTo(0, document.body.scrollHeight);
+  return posts;
+}
+"""
+
+# 아직 반환하지 않은 게시글이 DOM에 나타나면 true
+# (개수 대신 id로 판단 → 가상 스크롤로 노드가 교체돼도 동작)
+NEW_POST_ARRIVED_JS = """
+() => {
+  const seen = window.__tulipSeenPostIds || new Set();
+  return Array.from(document.querySelectorAll('[data-section-name="커뮤니티__게시글"]')).some(
+    (post) => {
+      const postId = post.getAttribute('data-post-anchor-id');
+      return postId && !seen.has(postId);
+    },
+  );
+}
+"""
+
+# 스크롤 후 다음 배치를 기다리는 최대 시간 (초). 이 안에 안 오면 더 불러올 게시글 없음으로 판단
+SCROLL_WAIT_TIMEOUT = float(os.getenv("CRAWLER_SCROLL_WAIT_TIMEOUT", "5"))
+
+
+async def iter_stock_feeds(
+    stock_id: str,
+    max_scrolls: int = 5,
+    since_post_id: Optional[str] = None,
+    known_post_ids: Optional[Iterable[str]] = None,
+    scroll_wait_timeout: float = SCROLL_WAIT_TIMEOUT,
+) -> AsyncIterator[List[Dict]]:
+    """
+    커뮤니티 최신순 피드 크롤링. 스크롤마다 새로 추출한 게시글 배치를 바로 yield.
+    since_post_id / known_post_ids가 주어지면 이미 저장된 게시글을 만나는 순간 스크롤을 멈추고
+    그보다 새로운 게시글만 반환 (증분 크롤링).
+    스크롤마다 다음 배치가 붙을 때까지 최대 scroll_wait_timeout초 대기.
+    """
+    url = f"{FEED_BASE_URL}/stocks/{stock_id}/community?feedSortType=RECENT"
 
-        context = await browser.new_context(
-            locale="ko-KR",
-            timezone_id="Asia/Seoul",
-            viewport={"width": 1280, "height": 900},
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/122.0.0.0 Safari/537.36"
-            ),
-        )
+    stop_ids = set(known_post_ids or ())
+    if since_post_id:
+        stop_ids.add(since_post_id)
 
-        page = await browser.new_page()
+    async with browser_pool.page(**FEED_CONTEXT_OPTIONS) as page:
+        await FEED_ROUTE_POLICY.apply(page)
+        await domain_limiter.wait(urlsplit(FEED_BASE_URL).netloc)
         await page.goto(url, wait_until='domcontentloaded', timeout=60000)
 
-        post_locator = page.locator('[data-section-name="커뮤니티__게시글"]')
+        post_locator = page.locator(POST_SELECTOR)
         await post_locator.first.wait_for(state="visible", timeout=30000)
 
-        stock_feeds: List[Dict] = []
-        seen_ids = set()
-
-        last_count = 0
-        for _ in range(max_scrolls):
-            # 현재 화면에 잡히는 포스트들
-            posts = await post_locator.element_handles()
-
-            for post in posts:
-                post_id = await post.get_attribute("data-post-anchor-id")
-                if not post_id or post_id in seen_ids:
-                    continue
-
-                text = ""
-                
-                text_el = await post.query_selector("span._1xixuox1")
-                if text_el:
-                    text = (await text_el.inner_text()).strip()
-
-                if not text:
-                    raw = (await post.inner_text()).strip()
-                    
-                    text = raw[:2000]
-
-                img_srcs: List[str] = []
-                img_els = await post.query_selector_all('ul[data-list-name="EditorImageList"] img')
-                for img in img_els:
-                    src = await img.get_attribute("src")
-                    if src:
-                        img_srcs.append(src)
-
-                stock_feeds.append({
-                    "postId": post_id,
-                    "text": text,
-                    "imageSrcs": img_srcs,
-                })
-                seen_ids.add(post_id)
-
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(1.8)
-
-            
-            cur_count = len(seen_ids)
-            if cur_count == last_count:
+        total = 0
+        for i in range(max_scrolls):
+            # 새 게시글 추출 + 스크롤을 evaluate 한 번으로 (이미 반환한 id는 페이지 쪽에서 건너뜀)
+            last_round = i == max_scrolls - 1
+            new_posts = await page.evaluate(EXTRACT_NEW_POSTS_AND_SCROLL_JS, not last_round)
+            if not new_posts:
                 break
-            last_count = cur_count
 
-        print(f"Crawling successful: {len(stock_feeds)} posts collected.")
-        await context.close()
-        await browser.close()
-        return stock_feeds
+            batch: List[Dict] = []
+            reached_known = False
+            for post in new_posts:
+                if post["postId"] in stop_ids:
+                    reached_known = True
+                    break
+                batch.append(post)
+
+            if batch:
+                total += len(batch)
+                yield batch
+            if reached_known or last_round:
+                break
+            if scroll_wait_timeout <= 0:
+                # Playwright에서 timeout=0은 무제한 대기이므로, 0이면 기다리지 않고 이미 붙은 게시글만 다시 추출
+                continue
 
+            # 고정 sleep 대신 다음 배치가 DOM에 붙는 순간까지만 대기
+            try:
+                # polling="mutation": DOM 변경(MutationObserver) 때마다 조건 재평가
+                await page.wait_for_function(
+                    NEW_POST_ARRIVED_JS,
+                    polling="mutation",
+                    timeout=scroll_wait_timeout * 1000,
+                )
+            except PlaywrightTimeoutError:
+                # 제한 시간 안에 새 게시글이 없으면 피드 끝
+                break
+
+        print(f"Crawling successful: {total} posts collected.")
+
+
+async def get_stock_feeds(
+    stock_id: str,
+    max_scrolls: int = 5,
+    since_post_id: Optional[str] = None,
+    known_post_ids: Optional[Iterable[str]] = None,
+    scroll_wait_timeout: float = SCROLL_WAIT_TIMEOUT,
+) -> List[Dict]:
+    """iter_stock_feeds의 배치를 모두 모아 한 번에 반환."""
+    stock_feeds: List[Dict] = []
+    async for batch in iter_stock_feeds(
+        stock_id=stock_id,
+        max_scrolls=max_scrolls,
+        since_post_id=since_post_id,
+        known_post_ids=known_post_ids,
+        scroll_wait_timeout=scroll_wait_timeout,
+    ):
+        stock_feeds.extend(batch)
+    return stock_feeds
 
 
 async def get_borrow_fee_second_row_html(symbol: str) -> dict[str, str] | None:
@@ -114,23 +195,13 @@ async def get_borrow_fee_second_row_html(symbol: str) -> dict[str, str] | None:
 
     symbol 예: nyse-hims, nasdaq-aapl
     """
-    url = f"https://chartexchange.com/symbol/{symbol}/borrow-fee/"
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-                "--disable-software-rasterizer",
-                "--disable-extensions",
-                "--no-first-run",
-            ],
-        )
-        try:
-            page = await browser.new_page()
+    url = f"{BORROW_FEE_BASE_URL}/symbol/{symbol}/borrow-fee/"
+
+    try:
+        async with browser_pool.page() as page:
+            # 이미지·폰트·트래커를 막아 두면 networkidle에 훨씬 빨리 도달
+            await BORROW_FEE_ROUTE_POLICY.apply(page)
+            await domain_limiter.wait(urlsplit(BORROW_FEE_BASE_URL).netloc)
             # JS 로딩이 필요한 경우를 대비해 networkidle까지 대기
             await page.goto(url, wait_until="networkidle", timeout=45000)
 
@@ -174,37 +245,26 @@ async def get_borrow_fee_second_row_html(symbol: str) -> dict[str, str] | None:
                 "available": available,
                 "rebate3": rebate3,
             }
-        except Exception as e:
-            # 크롤링 실패 시 서버 에러 대신 None 반환 (클라이언트에서 n/a 처리)
-            print(f"[borrow-fee crawler] error for symbol={symbol}: {e}")
-            return None
-        finally:
-            await browser.close()
+    except Exception as e:
+        # 크롤링 실패 시 서버 에러 대신 None 반환 (클라이언트에서 n/a 처리)
+        print(f"[borrow-fee crawler] error for symbol={symbol}: {e}")
+        return None
 
 
-def save_to_db(stock_id: str, feeds: List[Dict]) -> None:
-    if not DATABASE_URL:
+def save_to_db(stock_id: str, feeds: List[Dict]) -> Optional[Dict[str, int]]:
+    """피드를 post_id 기준으로 한 번에 upsert. 반환: {"inserted": n, "updated": m}"""
+    if get_pool() is None:
         print(
             "[crawler] DATABASE_URL not set — stock feeds not saved to DB. "
             "Set DATABASE_URL in crawler/.env (or env) to persist feeds."
         )
-        return
+        return None
 
-    conn = psycopg2.connect(DATABASE_URL)
-    cursor = conn.cursor()
-    try:
-        for feed in feeds:
-            cursor.execute(
-                """
-                INSERT INTO stock_feeds (stock_id, href, text, image_src)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (href) DO UPDATE SET
-                    text = EXCLUDED.text,
-                    image_src = EXCLUDED.image_src
-                """,
-                (stock_id, feed["href"], feed["text"], feed["imageSrc"]),
-            )
-        conn.commit()
-    finally:
-        cursor.close()
-        conn.close()
+    return upsert_feeds(stock_id=stock_id, feeds=feeds)
+
+
+def load_saved_post_ids(stock_id: str, limit: int = INCREMENTAL_KNOWN_IDS) -> List[str]:
+    """stock_feeds에 저장된 이 종목의 최근 게시글 id (최신순). DATABASE_URL이 없으면 빈 목록."""
+    if get_pool() is None:
+        return []
+    return select_saved_post_ids(stock_id=stock_id, limit=limit)
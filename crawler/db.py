@@ -0,0 +1,107 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[ThreadedConnectionPool]:
+    """프로세스 전역 커넥션 풀 (최초 사용 시 생성). DATABASE_URL이 없으면 None."""
+    global _pool
+    # .env는 app.py에서 import 이후에 로드되므로 호출 시점에 읽는다
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=int(os.getenv("DB_POOL_MAX", "5")),
+                    dsn=database_url,
+                )
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def connection() -> Iterator:
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+
+# post_id 기준 다건 upsert. xmax = 0 이면 이번에 새로 INSERT 된 행
+UPSERT_FEEDS_SQL = """
+INSERT INTO stock_feeds (stock_id, post_id, text, image_srcs)
+VALUES %s
+ON CONFLICT (post_id) DO UPDATE SET
+    stock_id = EXCLUDED.stock_id,
+    text = EXCLUDED.text,
+    image_srcs = EXCLUDED.image_srcs
+RETURNING (xmax = 0) AS inserted
+"""
+
+
+def upsert_feeds(stock_id: str, feeds: List[Dict]) -> Dict[str, int]:
+    """
+    피드를 한 번의 multi-row INSERT ... ON CONFLICT로 저장.
+    반환: {"inserted": 새로 저장된 수, "updated": 기존 행 갱신 수}
+    """
+    # 같은 문장 안에서 같은 post_id가 두 번 나오면 ON CONFLICT가 실패하므로 마지막 값만 남김
+    rows_by_id = {
+        feed["postId"]: (stock_id, feed["postId"], feed["text"], feed.get("imageSrcs") or [])
+        for feed in feeds
+        if feed.get("postId")
+    }
+    if not rows_by_id:
+        return {"inserted": 0, "updated": 0}
+
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            results = execute_values(
+                cursor,
+                UPSERT_FEEDS_SQL,
+                list(rows_by_id.values()),
+                page_size=len(rows_by_id),
+                fetch=True,
+            )
+
+    inserted = sum(1 for (is_insert,) in results if is_insert)
+    return {"inserted": inserted, "updated": len(results) - inserted}
+
+
+# 종목별로 저장된 최신 게시글 id (post_id는 숫자 문자열이라 길이 → 사전순이 곧 숫자 순서)
+SAVED_POST_IDS_SQL = """
+SELECT post_id FROM stock_feeds
+WHERE stock_id = %s AND post_id IS NOT NULL
+ORDER BY length(post_id) DESC, post_id DESC
+LIMIT %s
+"""
+
+
+def select_saved_post_ids(stock_id: str, limit: int) -> List[str]:
+    """이 종목으로 저장된 게시글 id를 최신순으로 최대 limit개."""
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(SAVED_POST_IDS_SQL, (stock_id, limit))
+            return [post_id for (post_id,) in cursor.fetchall()]
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# MinHash 순열용 메르센 소수 (2^31 - 1). a, h < 2^31이라 a * h + b가 uint64 안에서 넘치지 않는다
+_MERSENNE_PRIME = (1 << 31) - 1
+# 공백·문장부호·이모지 제거 (한글·자모·영숫자만 남김 → 줄바꿈·꾸밈만 다른 복붙도 같은 글로 본다)
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    return _NON_WORD_RE.sub("", text.lower())
+
+
+def image_key(src: str) -> str:
+    """리사이즈 등 쿼리 파라미터만 다른 같은 이미지 URL을 하나로 본다."""
+    parts = urlsplit(src)
+    return f"{parts.netloc}{parts.path}"
+
+
+class MinHasher:
+    """
+    문자 shingle 집합의 MinHash 서명 (서명이 일치하는 비율 ≈ Jaccard 유사도).
+    num_perm개 순열을 (num_perm, shingle 수) 행렬 한 번으로 계산하고 행별 최솟값을 취한다.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    def shingle_hashes(self, normalized: str) -> np.ndarray:
+        k = self.shingle_size
+        shingles = {normalized[i : i + k] for i in range(max(1, len(normalized) - k + 1))}
+        digests = b"".join(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles
+        )
+        return np.frombuffer(digests, dtype="<u8") % np.uint64(_MERSENNE_PRIME)
+
+    def signature(self, normalized: str) -> Tuple[int, ...]:
+        hashes = self.shingle_hashes(normalized)
+        permuted = (self._a * hashes + self._b) % np.uint64(_MERSENNE_PRIME)
+        return tuple(permuted.min(axis=1).tolist())
+
+
+def estimated_jaccard(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class LSHIndex:
+    """
+    MinHash 서명을 bands개 구간(구간당 rows개 값)으로 나눠 구간별 버킷에 넣는 banded LSH.
+    한 구간이라도 통째로 같으면 후보가 되므로, 비교 대상이 전체가 아니라 버킷 안으로 줄어든다.
+    (후보가 될 확률 1 - (1 - s^rows)^bands: 16x4면 Jaccard 0.5 부근에서 급격히 올라간다)
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows : (band + 1) * self.rows]
+
+    def add(self, key: str, signature: Tuple[int, ...]) -> None:
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str, signature: Tuple[int, ...]) -> None:
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def candidates(self, signature: Tuple[int, ...]) -> Set[str]:
+        found: Set[str] = set()
+        for band_key in self._band_keys(signature):
+            found |= self._buckets.get(band_key, set())
+        return found
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class _StockState:
+    def __init__(self, bands: int, rows: int):
+        self.lsh = LSHIndex(bands=bands, rows=rows)
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self.image_sets: Dict[FrozenSet[str], str] = {}
+        self.post_images: Dict[str, FrozenSet[str]] = {}
+        self.known: Set[str] = set()
+        self.order: deque = deque()
+
+
+class FeedDeduplicator:
+    """
+    종목별 최근 게시글에 대한 복붙·재게시 탐지.
+    - 본문이 min_chars자 이상: MinHash + banded LSH로 후보를 찾고, 추정 Jaccard가 threshold 이상이면 중복
+    - 본문이 짧은 글(스크린샷만 올린 글 등): 이미지 URL 집합이 같으면 중복
+    중복 글은 먼저 본 글(대표)에 묶여 저장·분석 대상에서 빠진다. 같은 postId를 다시 크롤링한 경우는 중복이 아니다.
+    종목별로 최근 max_posts개만 기억한다.
+    이미지 픽셀은 크롤러에서 차단하므로 (route policy) 여기서는 URL로만 비교하고,
+    다른 URL로 다시 올린 같은 이미지는 analysis의 perceptual hash가 묶는다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        num_perm: int = 64,
+        bands: int = 16,
+        min_chars: int = 20,
+        max_posts: int = 5000,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self.max_posts = max_posts
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+        self._stocks: Dict[str, _StockState] = {}
+        # 여러 종목 크롤링이 스레드에서 동시에 filter를 부를 수 있다
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.duplicates = 0
+
+    @classmethod
+    def from_env(cls) -> "FeedDeduplicator":
+        return cls(
+            threshold=float(os.getenv("CRAWLER_DEDUP_THRESHOLD", "0.7")),
+            min_chars=int(os.getenv("CRAWLER_DEDUP_MIN_CHARS", "20")),
+            max_posts=int(os.getenv("CRAWLER_DEDUP_MAX_POSTS", "5000")),
+        )
+
+    def _state(self, stock_id: str) -> _StockState:
+        state = self._stocks.get(stock_id)
+        if state is None:
+            state = self._stocks[stock_id] = _StockState(self.bands, self.rows)
+        return state
+
+    def _find_text_duplicate(
+        self, state: _StockState, signature: Tuple[int, ...]
+    ) -> Optional[str]:
+        best_id, best_score = None, self.threshold
+        for post_id in state.lsh.candidates(signature):
+            score = estimated_jaccard(signature, state.signatures[post_id])
+            if score >= best_score:
+                best_id, best_score = post_id, score
+        return best_id
+
+    def _remember(
+        self,
+        state: _StockState,
+        post_id: str,
+        signature: Optional[Tuple[int, ...]],
+        images: FrozenSet[str],
+    ) -> None:
+        if signature is not None:
+            state.signatures[post_id] = signature
+            state.lsh.add(post_id, signature)
+        if images:
+            state.image_sets.setdefault(images, post_id)
+            state.post_images[post_id] = images
+        state.known.add(post_id)
+        state.order.append(post_id)
+        while len(state.order) > self.max_posts:
+            self._forget(state, state.order.popleft())
+
+    @staticmethod
+    def _forget(state: _StockState, post_id: str) -> None:
+        state.known.discard(post_id)
+        signature = state.signatures.pop(post_id, None)
+        if signature is not None:
+            state.lsh.remove(post_id, signature)
+        images = state.post_images.pop(post_id, None)
+        if images is not None and state.image_sets.get(images) == post_id:
+            del state.image_sets[images]
+
+    def filter(self, stock_id: str, posts: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        (대표 게시글 목록, [{"postId", "duplicateOf"}]) 반환.
+        배치 안의 중복도, 이전 배치·이전 크롤링에서 본 글과의 중복도 함께 걸러낸다.
+        """
+        with self._lock:
+            return self._filter(self._state(stock_id), posts)
+
+    def _filter(self, state: _StockState, posts: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        unique: List[Dict] = []
+        duplicates: List[Dict] = []
+        for post in posts:
+            post_id = post.get("postId")
+            if not post_id or post_id in state.known:
+                unique.append(post)
+                continue
+            self.checked += 1
+
+            normalized = normalize_text(post.get("text") or "")
+            images = frozenset(image_key(src) for src in post.get("imageSrcs") or [])
+            signature = None
+            duplicate_of = None
+            if len(normalized) >= self.min_chars:
+                signature = self.hasher.signature(normalized)
+                duplicate_of = self._find_text_duplicate(state, signature)
+            elif images:
+                duplicate_of = state.image_sets.get(images)
+
+            if duplicate_of is not None:
+                self.duplicates += 1
+                duplicates.append({"postId": post_id, "duplicateOf": duplicate_of})
+                continue
+            self._remember(state, post_id, signature, images)
+            unique.append(post)
+        return unique, duplicates
+
+    def stats(self) -> dict:
+        return {
+            "stocks": len(self._stocks),
+            "tracked_posts": sum(len(s.order) for s in self._stocks.values()),
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+        }
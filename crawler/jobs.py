@@ -0,0 +1,297 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# 메모리에 들고 있을 완료 job 수 (store가 있으면 그 이상은 store에서 조회)
+MAX_FINISHED_JOBS = 1000
+
+
+class CrawlJob:
+    def __init__(
+        self,
+        stock_id: str,
+        params: dict,
+        job_id: Optional[str] = None,
+        status: str = QUEUED,
+        created_at: Optional[float] = None,
+    ):
+        self.id = job_id or uuid.uuid4().hex
+        self.stock_id = stock_id
+        self.params = params
+        self.status = status
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = created_at or time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    @property
+    def dedup_key(self) -> str:
+        return job_dedup_key(self.stock_id, self.params)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "stock_id": self.stock_id,
+            "status": self.status,
+            "params": self.params,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def job_dedup_key(stock_id: str, params: dict) -> str:
+    return stock_id + "|" + json.dumps(params, sort_keys=True)
+
+
+class SqliteJobStore:
+    """
+    job 상태를 SQLite에 기록 → 재시작 시 대기/실행 중이던 job을 다시 큐에 넣는다.
+    JobQueue가 asyncio.to_thread로 부르므로 연결 하나를 lock으로 보호한다.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_jobs (
+                id TEXT PRIMARY KEY,
+                stock_id TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def save(self, job: CrawlJob) -> None:
+        with self._lock:
+            self._save(job)
+
+    def _save(self, job: CrawlJob) -> None:
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO crawl_jobs
+                (id, stock_id, params, status, result, error, created_at, started_at, finished_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                job.id,
+                job.stock_id,
+                json.dumps(job.params),
+                job.status,
+                json.dumps(job.result, ensure_ascii=False) if job.result is not None else None,
+                job.error,
+                job.created_at,
+                job.started_at,
+                job.finished_at,
+            ),
+        )
+        self._conn.commit()
+
+    def load(self, job_id: str) -> Optional[CrawlJob]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, stock_id, params, status, result, error, created_at, started_at, finished_at "
+                "FROM crawl_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def load_unfinished(self) -> List[CrawlJob]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, stock_id, params, status, result, error, created_at, started_at, finished_at "
+                "FROM crawl_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    @staticmethod
+    def _from_row(row: tuple) -> CrawlJob:
+        job_id, stock_id, params, status, result, error, created_at, started_at, finished_at = row
+        job = CrawlJob(stock_id, json.loads(params), job_id=job_id, status=status, created_at=created_at)
+        job.result = json.loads(result) if result else None
+        job.error = error
+        job.started_at = started_at
+        job.finished_at = finished_at
+        if job.finished:
+            job.done.set()
+        return job
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """
+    인프로세스 크롤링 job 큐.
+    - submit은 job id를 바로 반환하고, workers개의 워커가 순서대로 실행
+    - 같은 종목·같은 파라미터의 job이 대기/실행 중이면 새로 만들지 않고 그 job을 돌려준다
+    - store가 있으면 상태를 기록하고, start 시 끝나지 않은 job을 복구
+    """
+
+    def __init__(
+        self,
+        runner: Callable[..., Awaitable[dict]],
+        workers: int = 2,
+        store: Optional[SqliteJobStore] = None,
+    ):
+        self._runner = runner
+        self.workers = max(1, workers)
+        self._store = store
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: "OrderedDict[str, CrawlJob]" = OrderedDict()
+        self._in_flight: Dict[str, CrawlJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls, runner: Callable[..., Awaitable[dict]]) -> "JobQueue":
+        db_path = os.getenv("CRAWLER_JOB_DB")
+        return cls(
+            runner=runner,
+            workers=int(os.getenv("CRAWLER_JOB_WORKERS", "2")),
+            store=SqliteJobStore(db_path) if db_path else None,
+        )
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        if self._store is not None:
+            for job in await asyncio.to_thread(self._store.load_unfinished):
+                # 실행 도중 재시작된 job은 처음부터 다시
+                job.status = QUEUED
+                job.started_at = None
+                await self._enqueue(job)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._store is not None:
+            await asyncio.to_thread(self._store.close)
+
+    async def _enqueue(self, job: CrawlJob) -> None:
+        # 중복 확인에 쓰는 등록은 await 전에 끝내 둔다 (기록하는 동안 들어온 같은 요청도 이 job을 받음)
+        self._jobs[job.id] = job
+        self._in_flight[job.dedup_key] = job
+        try:
+            await self._persist(job)
+        except Exception:
+            # 큐에 넣지 못한 job이 중복 확인에 걸려 같은 요청을 영영 막지 않도록 등록을 되돌린다
+            self._jobs.pop(job.id, None)
+            if self._in_flight.get(job.dedup_key) is job:
+                del self._in_flight[job.dedup_key]
+            raise
+        self._queue.put_nowait(job)
+
+    async def submit(self, stock_id: str, params: dict) -> Tuple[CrawlJob, bool]:
+        """(job, deduplicated) 반환. deduplicated면 이미 진행 중인 job."""
+        existing = self._in_flight.get(job_dedup_key(stock_id, params))
+        if existing is not None:
+            return existing, True
+        job = CrawlJob(stock_id, params)
+        await self._enqueue(job)
+        return job, False
+
+    async def get(self, job_id: str) -> Optional[CrawlJob]:
+        job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            job = await asyncio.to_thread(self._store.load, job_id)
+        return job
+
+    async def wait(self, job: CrawlJob, timeout: float) -> CrawlJob:
+        """job이 끝나거나 timeout초가 지날 때까지 대기 (long-poll)."""
+        if timeout > 0 and not job.finished:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 상태 기록 실패 (디스크 부족, SQLite lock 등) — 워커는 계속 돌고 job은 메모리에서 실패로 끝낸다
+                print(f"[jobs] could not persist job {job.id} for stock_id={job.stock_id}: {e!r}")
+                job.error = f"failed to persist job state: {e}"
+                job.status = FAILED
+                self._finish(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: CrawlJob) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        await self._persist(job)
+        try:
+            job.result = await self._runner(stock_id=job.stock_id, **job.params)
+            job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[jobs] job {job.id} failed for stock_id={job.stock_id}: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        job.finished_at = time.time()
+        self._in_flight.pop(job.dedup_key, None)
+        await self._persist(job)
+        self._finish(job)
+
+    def _finish(self, job: CrawlJob) -> None:
+        if job.finished_at is None:
+            job.finished_at = time.time()
+        self._in_flight.pop(job.dedup_key, None)
+        job.done.set()
+        self._trim()
+
+    async def _persist(self, job: CrawlJob) -> None:
+        # SQLite commit(fsync)은 이벤트 루프 밖에서
+        if self._store is not None:
+            await asyncio.to_thread(self._store.save, job)
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "in_flight": len(self._in_flight),
+            "tracked": len(self._jobs),
+            "persistent": self._store is not None,
+        }
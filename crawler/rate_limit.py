@@ -0,0 +1,32 @@
+import asyncio
+import os
+import time
+from typing import Dict
+
+
+class DomainRateLimiter:
+    """
+    도메인별 요청 시작 간격 제한 (초당 rate회).
+    동시에 여러 종목을 크롤링해도 같은 사이트에 한꺼번에 몰리지 않도록 page.goto 직전에 대기.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_at: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls) -> "DomainRateLimiter":
+        return cls(rate=float(os.getenv("CRAWLER_DOMAIN_RPS", "2")))
+
+    async def wait(self, domain: str) -> None:
+        if not self.interval:
+            return
+        # 슬롯만 lock 안에서 예약하고 대기는 밖에서 (다른 도메인을 막지 않음)
+        async with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at.get(domain, 0.0))
+            self._next_at[domain] = start_at + self.interval
+        delay = start_at - now
+        if delay > 0:
+            await asyncio.sleep(delay)
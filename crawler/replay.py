@@ -0,0 +1,438 @@
+"""
+크롤러 오프라인 재현용 record/replay.
+
+- record: 실제 사이트를 한 번 크롤링하면서 스크롤 배치별 게시글 outerHTML(피드)과
+  렌더링된 정적 HTML(borrow-fee)을 fixture JSON으로 저장 (script 태그는 제거, img src는 /__replay/img/로 치환)
+- synth: 실제 DOM 구조(선택자)를 흉내 낸 합성 fixture 생성 (네트워크 없이 바로 벤치마크 가능)
+- serve: fixture를 로컬 대역 서버로 제공. 피드는 첫 배치만 HTML에 넣고, 맨 아래로 스크롤하면
+  다음 배치를 fetch로 받아 붙이는 무한 스크롤을 스크립트로 재현
+
+크롤러를 대역 서버로 돌리려면 CRAWLER_FEED_BASE_URL / CRAWLER_BORROW_FEE_BASE_URL을 서버 주소로 준다.
+
+    python replay.py record-feed 005930 --max-scrolls 5
+    python replay.py record-borrow-fee nasdaq-aapl
+    python replay.py synth
+    python replay.py serve --port 8090
+"""
+import argparse
+import asyncio
+import hashlib
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_SCRIPT_RE = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+_IMG_SRC_RE = re.compile(r"(<img\b[^>]*?\ssrc=)([\"'])(.*?)\2", re.IGNORECASE | re.DOTALL)
+_IMG_SRCSET_RE = re.compile(r"(<img\b[^>]*?)\ssrcset=([\"']).*?\2", re.IGNORECASE | re.DOTALL)
+
+# 녹화: 아직 저장하지 않은 게시글 노드의 outerHTML만 반환
+RECORD_NEW_POSTS_JS = """
+(selector) => {
+  const seen = (window.__tulipRecordedPostIds ||= new Set());
+  const out = [];
+  for (const post of document.querySelectorAll(selector)) {
+    const postId = post.getAttribute('data-post-anchor-id');
+    if (!postId || seen.has(postId)) continue;
+    seen.add(postId);
+    out.push(post.outerHTML);
+  }
+  return out;
+}
+"""
+
+# 재생 페이지의 무한 스크롤: 바닥 근처까지 스크롤되면 다음 배치를 받아 붙인다
+REPLAY_SCROLL_JS = """
+(() => {
+  const feed = document.querySelector('[data-replay-feed]');
+  let next = 1, loading = false, done = false;
+  const load = async () => {
+    if (loading || done) return;
+    if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+    loading = true;
+    try {
+      const res = await fetch(`__BATCH_URL__?n=${next}`);
+      if (!res.ok) { done = true; return; }
+      const body = await res.text();
+      // 실제 사이트처럼 응답 후 렌더링까지 약간의 지연
+      await new Promise((resolve) => setTimeout(resolve, __RENDER_DELAY_MS__));
+      feed.insertAdjacentHTML('beforeend', body);
+      next += 1;
+    } catch (e) {
+      // 요청이 실패하면 다음 스크롤 때 같은 배치를 다시 시도
+    } finally {
+      loading = false;
+    }
+  };
+  window.addEventListener('scroll', load, { passive: true });
+})();
+"""
+
+FEED_PAGE_TEMPLATE = """<!doctype html>
+<html lang="ko"><head><meta charset="utf-8"><title>replay {stock_id}</title>
+<style>
+  body {{ margin: 0; font-family: sans-serif; }}
+  [data-section-name] {{ display: block; min-height: 160px; border-bottom: 1px solid #ddd; }}
+</style></head>
+<body><main><div data-replay-feed>{first_batch}</div></main>
+<script>{script}</script></body></html>
+"""
+
+_IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif"}
+
+# 1x1 투명 PNG (이미지 차단을 끈 경우에도 응답할 수 있도록)
+_PIXEL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+def strip_scripts(document: str) -> str:
+    """녹화한 HTML에서 script 제거 (재생 시 원래 앱이 다시 하이드레이션·네트워크 요청하지 않도록)."""
+    return _SCRIPT_RE.sub("", document)
+
+
+def _replay_image_url(src: str) -> str:
+    # 같은 원본 URL은 같은 재생 URL로 (URL 기준 중복 탐지가 녹화 때와 똑같이 동작하도록)
+    digest = hashlib.sha1(html.unescape(src).encode("utf-8")).hexdigest()[:16]
+    ext = os.path.splitext(urlsplit(html.unescape(src)).path)[1].lower()
+    return f"/__replay/img/{digest}{ext if ext in _IMAGE_EXTS else '.png'}"
+
+
+def rewrite_images(document: str) -> str:
+    """img src를 대역 서버의 /__replay/img/ 경로로 바꾸고 srcset은 제거 (재생 중 원본 CDN에 접속하지 않도록)."""
+    while True:
+        stripped = _IMG_SRCSET_RE.sub(r"\1", document)
+        if stripped == document:
+            break
+        document = stripped
+    return _IMG_SRC_RE.sub(
+        lambda m: f"{m.group(1)}{m.group(2)}{_replay_image_url(m.group(3))}{m.group(2)}",
+        document,
+    )
+
+
+def feed_fixture_path(directory: str, stock_id: str) -> str:
+    return os.path.join(directory, f"feed_{stock_id}.json")
+
+
+def borrow_fee_fixture_path(directory: str, symbol: str) -> str:
+    return os.path.join(directory, f"borrow_fee_{symbol}.json")
+
+
+def _write_json(path: str, payload: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+
+
+# ---------------------------------------------------------------------------
+# record
+
+
+async def record_feed(
+    stock_id: str, max_scrolls: int = 5, scroll_wait: float = 2.0, directory: str = FIXTURES_DIR
+) -> str:
+    """실제 피드를 스크롤하며 배치별 게시글 HTML을 저장하고 fixture 경로를 반환."""
+    from crawler import FEED_BASE_URL, FEED_CONTEXT_OPTIONS, POST_SELECTOR, browser_pool
+
+    url = f"{FEED_BASE_URL}/stocks/{stock_id}/community?feedSortType=RECENT"
+    batches: List[List[str]] = []
+    try:
+        async with browser_pool.page(**FEED_CONTEXT_OPTIONS) as page:
+            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            await page.locator(POST_SELECTOR).first.wait_for(state="visible", timeout=30000)
+            for _ in range(max_scrolls):
+                batch = await page.evaluate(RECORD_NEW_POSTS_JS, POST_SELECTOR)
+                if not batch:
+                    break
+                batches.append(batch)
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                await page.wait_for_timeout(scroll_wait * 1000)
+    finally:
+        await browser_pool.stop()
+
+    path = feed_fixture_path(directory, stock_id)
+    _write_json(
+        path,
+        {
+            "kind": "feed",
+            "stock_id": stock_id,
+            "source_url": url,
+            "recorded_at": time.time(),
+            "batches": [
+                [rewrite_images(strip_scripts(post)) for post in batch] for batch in batches
+            ],
+        },
+    )
+    print(f"[replay] recorded {sum(map(len, batches))} posts in {len(batches)} batches -> {path}")
+    return path
+
+
+async def record_borrow_fee(symbol: str, directory: str = FIXTURES_DIR) -> str:
+    """borrow-fee 페이지를 테이블 렌더링 후의 정적 HTML로 저장."""
+    from crawler import BORROW_FEE_BASE_URL, browser_pool
+
+    url = f"{BORROW_FEE_BASE_URL}/symbol/{symbol}/borrow-fee/"
+    try:
+        async with browser_pool.page() as page:
+            await page.goto(url, wait_until="networkidle", timeout=45000)
+            await page.wait_for_selector("table", state="attached", timeout=30000)
+            document = await page.content()
+    finally:
+        await browser_pool.stop()
+
+    path = borrow_fee_fixture_path(directory, symbol)
+    _write_json(
+        path,
+        {
+            "kind": "borrow_fee",
+            "symbol": symbol,
+            "source_url": url,
+            "recorded_at": time.time(),
+            "html": rewrite_images(strip_scripts(document)),
+        },
+    )
+    print(f"[replay] recorded borrow-fee page -> {path}")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# synth
+
+
+_SYNTH_PHRASES = [
+    "오늘 실적 발표 기대됩니다", "외국인 매도 언제 끝나나요 ㅠㅠ", "가즈아 🚀🚀", "존버는 승리한다",
+    "물타기 했습니다", "환율 때문에 힘드네요", "배당 들어왔어요 ㅋㅋ", "손절각인가요",
+    "반도체 업황 회복 중", "공매도 세력 무섭네", "$NVDA 따라가자", "다들 수익 중이신가요?",
+]
+
+
+def write_synthetic_fixtures(
+    directory: str = FIXTURES_DIR,
+    stock_id: str = "000000",
+    symbol: str = "nasdaq-test",
+    batches: int = 5,
+    posts_per_batch: int = 20,
+    seed: int = 0,
+) -> Tuple[str, str]:
+    """실제 선택자 구조를 따르는 합성 피드·borrow-fee fixture를 만든다."""
+    rng = random.Random(seed)
+    next_id = 10_000_000
+    feed_batches: List[List[str]] = []
+    for _ in range(batches):
+        batch = []
+        for _ in range(posts_per_batch):
+            text = " ".join(rng.choice(_SYNTH_PHRASES) for _ in range(rng.randint(1, 6)))
+            images = "".join(
+                f'<li><img src="/__replay/img/{next_id}-{i}.png"></li>'
+                for i in range(rng.choice((0, 0, 1, 2)))
+            )
+            image_list = f'<ul data-list-name="EditorImageList">{images}</ul>' if images else ""
+            batch.append(
+                f'<article data-section-name="커뮤니티__게시글" data-post-anchor-id="{next_id}">'
+                f'<span class="_1xixuox1">{html.escape(text)}</span>{image_list}</article>'
+            )
+            # 최신순 피드라 아래로 갈수록 id가 작다
+            next_id -= rng.randint(1, 50)
+        feed_batches.append(batch)
+
+    feed_path = feed_fixture_path(directory, stock_id)
+    _write_json(
+        feed_path,
+        {"kind": "feed", "stock_id": stock_id, "synthetic": True, "batches": feed_batches},
+    )
+
+    rows = "".join(
+        f"<tr><td>2026-10-{day:02d} 09:00</td><td>{rng.uniform(0.2, 30):.2f}%</td>"
+        f"<td>{rng.randint(0, 5_000_000):,}</td><td>{rng.uniform(-25, 4):.2f}%</td></tr>"
+        for day in range(18, 8, -1)
+    )
+    borrow_fee_html = (
+        "<!doctype html><html><head><meta charset='utf-8'><title>borrow fee</title></head><body>"
+        "<table><thead><tr><th>Updated</th><th>Fee</th><th>Available</th><th>Rebate</th></tr>"
+        f"</thead><tbody>{rows}</tbody></table></body></html>"
+    )
+    borrow_fee_path = borrow_fee_fixture_path(directory, symbol)
+    _write_json(
+        borrow_fee_path,
+        {"kind": "borrow_fee", "symbol": symbol, "synthetic": True, "html": borrow_fee_html},
+    )
+    return feed_path, borrow_fee_path
+
+
+# ---------------------------------------------------------------------------
+# serve
+
+
+class ReplayServer:
+    """
+    fixture 디렉터리를 실제 사이트와 같은 경로로 제공하는 로컬 대역 서버 (스레드에서 실행).
+    - /stocks/{stock_id}/community        피드 첫 배치 + 무한 스크롤 스크립트
+    - /__replay/feed/{stock_id}?n=k        k번째 스크롤 배치 (없으면 404 → 피드 끝)
+    - /symbol/{symbol}/borrow-fee/         녹화한 정적 HTML
+    응답 바이트·요청 수를 세어 두므로 크롤링 한 번에 받은 양을 잴 수 있다.
+    """
+
+    def __init__(
+        self,
+        directory: str = FIXTURES_DIR,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        render_delay_ms: int = 100,
+    ):
+        self.directory = directory
+        self.render_delay_ms = render_delay_ms
+        self._fixtures: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+        self.requests = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.bytes_sent = 0
+            self.requests = 0
+
+    def _fixture(self, path: str) -> Optional[dict]:
+        if path not in self._fixtures:
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding="utf-8") as f:
+                self._fixtures[path] = json.load(f)
+        return self._fixtures[path]
+
+    def _route(self, raw_path: str) -> Tuple[int, str, bytes]:
+        parts = urlsplit(raw_path)
+        segments = [s for s in parts.path.split("/") if s]
+
+        if len(segments) == 3 and segments[0] == "stocks" and segments[2] == "community":
+            fixture = self._fixture(feed_fixture_path(self.directory, segments[1]))
+            if fixture is None:
+                return 404, "text/plain", b"no fixture"
+            script = REPLAY_SCROLL_JS.replace(
+                "__BATCH_URL__", f"/__replay/feed/{segments[1]}"
+            ).replace("__RENDER_DELAY_MS__", str(self.render_delay_ms))
+            batches = fixture["batches"]
+            page = FEED_PAGE_TEMPLATE.format(
+                stock_id=html.escape(segments[1]),
+                first_batch="".join(batches[0]) if batches else "",
+                script=script,
+            )
+            return 200, "text/html; charset=utf-8", page.encode("utf-8")
+
+        if len(segments) == 3 and segments[:2] == ["__replay", "feed"]:
+            fixture = self._fixture(feed_fixture_path(self.directory, segments[2]))
+            try:
+                n = int(parse_qs(parts.query).get("n", ["0"])[0])
+            except ValueError:
+                return 400, "text/plain", b"n must be an integer"
+            if fixture is None or not 0 < n < len(fixture["batches"]):
+                return 404, "text/plain", b"end of feed"
+            return 200, "text/html; charset=utf-8", "".join(fixture["batches"][n]).encode("utf-8")
+
+        if len(segments) == 3 and segments[0] == "symbol" and segments[2] == "borrow-fee":
+            fixture = self._fixture(borrow_fee_fixture_path(self.directory, segments[1]))
+            if fixture is None:
+                return 404, "text/plain", b"no fixture"
+            return 200, "text/html; charset=utf-8", fixture["html"].encode("utf-8")
+
+        if segments[:2] == ["__replay", "img"]:
+            return 200, "image/png", _PIXEL_PNG
+
+        return 404, "text/plain", b"not found"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    status, content_type, body = server._route(self.path)
+                except Exception as e:
+                    # 응답 없이 연결을 끊지 않도록 (크롤러 쪽에서는 원인 모를 net::ERR로 보임)
+                    status, content_type, body = 500, "text/plain", repr(e).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="crawler record/replay fixtures")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    feed = sub.add_parser("record-feed")
+    feed.add_argument("stock_id")
+    feed.add_argument("--max-scrolls", type=int, default=5)
+    feed.add_argument("--scroll-wait", type=float, default=2.0)
+
+    borrow_fee = sub.add_parser("record-borrow-fee")
+    borrow_fee.add_argument("symbol")
+
+    synth = sub.add_parser("synth")
+    synth.add_argument("--batches", type=int, default=5)
+    synth.add_argument("--posts-per-batch", type=int, default=20)
+
+    serve = sub.add_parser("serve")
+    serve.add_argument("--port", type=int, default=8090)
+    serve.add_argument("--render-delay-ms", type=int, default=100)
+
+    args = parser.parse_args(argv)
+    if args.command == "record-feed":
+        asyncio.run(
+            record_feed(args.stock_id, args.max_scrolls, args.scroll_wait, directory=args.fixtures)
+        )
+    elif args.command == "record-borrow-fee":
+        asyncio.run(record_borrow_fee(args.symbol, directory=args.fixtures))
+    elif args.command == "synth":
+        for path in write_synthetic_fixtures(
+            args.fixtures, batches=args.batches, posts_per_batch=args.posts_per_batch
+        ):
+            print(f"[replay] wrote {path}")
+    else:
+        server = ReplayServer(args.fixtures, port=args.port, render_delay_ms=args.render_delay_ms)
+        print(f"[replay] serving {args.fixtures} at {server.start()}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Page, Route
+
+# DOM 텍스트와 img src만 필요하므로 실제 바이트는 받지 않는 리소스 타입
+# (stylesheet는 레이아웃·무한 스크롤 높이 계산에 필요해서 유지)
+DEFAULT_BLOCK_RESOURCE_TYPES = ("image", "media", "font")
+
+# 분석·광고·트래커 도메인 (서브도메인 포함)
+DEFAULT_BLOCK_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "facebook.com",
+    "clarity.ms",
+    "hotjar.com",
+    "amplitude.com",
+    "mixpanel.com",
+    "segment.io",
+    "scorecardresearch.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "quantserve.com",
+    "adnxs.com",
+    "browser-intake-datadoghq.com",
+)
+
+
+def env_list(name: str) -> Optional[tuple[str, ...]]:
+    raw = os.getenv(name)
+    if raw is None:
+        return None
+    return tuple(v.strip() for v in raw.split(",") if v.strip())
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class RoutePolicy:
+    """
+    page.route로 필요 없는 요청을 abort 하는 정책.
+    - document 요청은 항상 통과
+    - allow_domains가 있으면 그 도메인(서브도메인 포함) 밖 요청은 모두 차단
+    - block_domains / block_resource_types에 걸리면 차단
+    """
+
+    def __init__(
+        self,
+        block_resource_types: Iterable[str] = DEFAULT_BLOCK_RESOURCE_TYPES,
+        block_domains: Iterable[str] = DEFAULT_BLOCK_DOMAINS,
+        allow_domains: Optional[Iterable[str]] = None,
+        enabled: bool = True,
+    ):
+        self.block_resource_types = frozenset(block_resource_types)
+        self.block_domains = tuple(block_domains)
+        self.allow_domains = tuple(allow_domains) if allow_domains else None
+        self.enabled = enabled
+        self.blocked = 0
+        self.allowed = 0
+
+    @classmethod
+    def from_env(cls, allow_domains: Optional[Iterable[str]] = None) -> "RoutePolicy":
+        """
+        CRAWLER_ROUTE_POLICY=off 로 끌 수 있고,
+        CRAWLER_BLOCK_RESOURCE_TYPES / CRAWLER_BLOCK_DOMAINS (쉼표 구분)로 기본값을 덮어쓴다.
+        """
+        return cls(
+            block_resource_types=env_list("CRAWLER_BLOCK_RESOURCE_TYPES")
+            or DEFAULT_BLOCK_RESOURCE_TYPES,
+            block_domains=env_list("CRAWLER_BLOCK_DOMAINS") or DEFAULT_BLOCK_DOMAINS,
+            allow_domains=allow_domains,
+            enabled=os.getenv("CRAWLER_ROUTE_POLICY", "on").lower() != "off",
+        )
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if resource_type == "document":
+            return False
+        host = (urlsplit(url).hostname or "").lower()
+        if not host:
+            # data:, blob: 등
+            return resource_type in self.block_resource_types
+        if self.allow_domains is not None and not _host_matches(host, self.allow_domains):
+            return True
+        if _host_matches(host, self.block_domains):
+            return True
+        return resource_type in self.block_resource_types
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.blocked += 1
+            await route.abort()
+        else:
+            self.allowed += 1
+            await route.continue_()
+
+    async def apply(self, page: Page) -> None:
+        if self.enabled:
+            await page.route("**/*", self._handle)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "blocked": self.blocked, "allowed": self.allowed}
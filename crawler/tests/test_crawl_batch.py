@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import app as crawler_app
+
+# 종목별 크롤링 시간 (초). 끝나는 순서대로 줄이 나와야 한다
+DELAYS = {"000001": 0.1, "000002": 0.02, "000003": 0.06, "000004": 0.04, "000005": 0.0}
+
+
+def _run_batch(monkeypatch, concurrency, stock_ids):
+    running = 0
+    peak = 0
+
+    async def fake_crawl_stock(stock_id, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(DELAYS[stock_id])
+            if stock_id == "000003":
+                raise RuntimeError("page crashed")
+            return {"status": "success", "count": 1, "feeds": [{"postId": stock_id}]}
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(crawler_app, "crawl_stock", fake_crawl_stock)
+
+    async def collect():
+        request = crawler_app.CrawlBatchRequest(stock_ids=stock_ids, concurrency=concurrency)
+        response = await crawler_app.crawl_batch(request)
+        assert response.media_type == "application/x-ndjson"
+        return [json.loads(line) async for line in response.body_iterator]
+
+    return asyncio.run(collect()), peak
+
+
+def test_one_line_per_stock_and_failure_is_isolated(monkeypatch):
+    stock_ids = list(DELAYS) + ["000001"]  # 중복 종목은 한 번만
+    lines, peak = _run_batch(monkeypatch, concurrency=2, stock_ids=stock_ids)
+
+    assert sorted(line["stock_id"] for line in lines) == sorted(DELAYS)
+    by_stock = {line["stock_id"]: line for line in lines}
+    assert by_stock["000003"] == {
+        "stock_id": "000003",
+        "status": "error",
+        "detail": "page crashed",
+    }
+    assert all(line["status"] == "success" for s, line in by_stock.items() if s != "000003")
+    assert peak <= 2
+
+
+def test_lines_arrive_in_completion_order(monkeypatch):
+    lines, peak = _run_batch(monkeypatch, concurrency=len(DELAYS), stock_ids=list(DELAYS))
+    assert peak == len(DELAYS)
+    assert [line["stock_id"] for line in lines] == sorted(DELAYS, key=DELAYS.get)
+
+
+def test_concurrency_one_runs_sequentially(monkeypatch):
+    lines, peak = _run_batch(monkeypatch, concurrency=1, stock_ids=list(DELAYS))
+    assert peak == 1
+    assert len(lines) == len(DELAYS)
@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+
+import db
+
+
+class _Cursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Connection:
+    def cursor(self):
+        return _Cursor()
+
+
+def _stub_upsert(monkeypatch, returned_rows):
+    calls = []
+
+    @contextmanager
+    def fake_connection():
+        yield _Connection()
+
+    def fake_execute_values(cursor, sql, rows, page_size, fetch):
+        calls.append({"sql": sql, "rows": rows, "page_size": page_size, "fetch": fetch})
+        return returned_rows(rows)
+
+    monkeypatch.setattr(db, "connection", fake_connection)
+    monkeypatch.setattr(db, "execute_values", fake_execute_values)
+    return calls
+
+
+def test_counts_inserted_and_updated_rows(monkeypatch):
+    # RETURNING (xmax = 0): 새로 INSERT된 행은 True, 기존 행 갱신은 False
+    calls = _stub_upsert(monkeypatch, lambda rows: [(True,), (False,), (True,)])
+    feeds = [
+        {"postId": "3", "text": "c", "imageSrcs": ["https://x/1.png"]},
+        {"postId": "2", "text": "b"},
+        {"postId": "1", "text": "a", "imageSrcs": None},
+    ]
+    assert db.upsert_feeds("005930", feeds) == {"inserted": 2, "updated": 1}
+
+    (call,) = calls
+    assert call["sql"] is db.UPSERT_FEEDS_SQL and call["fetch"] is True
+    assert call["page_size"] == 3
+    assert call["rows"] == [
+        ("005930", "3", "c", ["https://x/1.png"]),
+        ("005930", "2", "b", []),
+        ("005930", "1", "a", []),
+    ]
+
+
+def test_duplicate_and_missing_post_ids(monkeypatch):
+    calls = _stub_upsert(monkeypatch, lambda rows: [(False,)] * len(rows))
+    feeds = [
+        {"postId": "1", "text": "old"},
+        {"postId": None, "text": "no id"},
+        {"postId": "1", "text": "new"},
+    ]
+    # 같은 post_id는 한 문장에 한 번만 (마지막 값), id 없는 글은 제외
+    assert db.upsert_feeds("005930", feeds) == {"inserted": 0, "updated": 1}
+    assert calls[0]["rows"] == [("005930", "1", "new", [])]
+
+
+def test_nothing_to_upsert_skips_the_database(monkeypatch):
+    calls = _stub_upsert(monkeypatch, lambda rows: [])
+    assert db.upsert_feeds("005930", [{"text": "no id"}]) == {"inserted": 0, "updated": 0}
+    assert calls == []
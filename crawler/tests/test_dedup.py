@@ -0,0 +1,68 @@
+import numpy as np
+
+from dedup import FeedDeduplicator, LSHIndex, MinHasher, estimated_jaccard, normalize_text
+
+ORIGINAL = "삼성전자 오늘 실적 발표 보고 다들 매수하세요. 외국인 기관 다 사는 중이고 내일 시초가 기대됩니다 가즈아"
+NEAR_DUPLICATE = ORIGINAL + " ㅋㅋㅋ 🚀"
+DISTINCT = "환율이랑 금리 때문에 나스닥 폭락했네요. 손절할지 물타기할지 아직 모르겠습니다 형님들 의견 부탁"
+
+
+def _bands(lsh: LSHIndex, signature):
+    return set(lsh._band_keys(signature))
+
+
+def test_signature_is_deterministic_and_in_range():
+    hasher = MinHasher()
+    a = hasher.signature(normalize_text(ORIGINAL))
+    assert a == MinHasher().signature(normalize_text(ORIGINAL))
+    assert len(a) == hasher.num_perm
+    assert all(isinstance(v, int) and 0 <= v < (1 << 31) - 1 for v in a)
+
+
+def test_signature_matches_scalar_reference():
+    hasher = MinHasher(num_perm=16)
+    normalized = normalize_text(ORIGINAL)
+    hashes = hasher.shingle_hashes(normalized).tolist()
+    expected = tuple(
+        min((int(a) * h + int(b)) % ((1 << 31) - 1) for h in hashes)
+        for a, b in zip(hasher._a.ravel(), hasher._b.ravel())
+    )
+    assert hasher.signature(normalized) == expected
+
+
+def test_near_duplicates_share_a_bucket_and_distinct_posts_do_not():
+    hasher = MinHasher()
+    lsh = LSHIndex(bands=16, rows=4)
+    original = hasher.signature(normalize_text(ORIGINAL))
+    near = hasher.signature(normalize_text(NEAR_DUPLICATE))
+    distinct = hasher.signature(normalize_text(DISTINCT))
+
+    lsh.add("original", original)
+    assert "original" in lsh.candidates(near)
+    assert "original" not in lsh.candidates(distinct)
+    assert _bands(lsh, original) & _bands(lsh, near)
+    assert not _bands(lsh, original) & _bands(lsh, distinct)
+    assert estimated_jaccard(original, near) >= 0.7
+    assert estimated_jaccard(original, distinct) < 0.3
+
+
+def test_feed_deduplicator_filters_reposts():
+    dedup = FeedDeduplicator()
+    posts = [
+        {"postId": "1", "text": ORIGINAL, "imageSrcs": []},
+        {"postId": "2", "text": NEAR_DUPLICATE, "imageSrcs": []},
+        {"postId": "3", "text": DISTINCT, "imageSrcs": []},
+    ]
+    unique, duplicates = dedup.filter("005930", posts)
+    assert [p["postId"] for p in unique] == ["1", "3"]
+    assert duplicates == [{"postId": "2", "duplicateOf": "1"}]
+
+    # 같은 글을 다시 크롤링한 것은 중복이 아니다
+    unique, duplicates = dedup.filter("005930", posts[:1])
+    assert [p["postId"] for p in unique] == ["1"] and not duplicates
+
+
+def test_empty_text_has_a_signature():
+    hasher = MinHasher()
+    assert hasher.shingle_hashes("").dtype == np.uint64
+    assert len(hasher.signature("")) == hasher.num_perm
@@ -0,0 +1,87 @@
+import asyncio
+
+import app as crawler_app
+
+
+def test_incremental_falls_back_to_saved_post_ids(monkeypatch):
+    loaded = []
+
+    def fake_load(stock_id):
+        loaded.append(stock_id)
+        return ["1003", "1002", "1001"]
+
+    monkeypatch.setattr(crawler_app, "load_saved_post_ids", fake_load)
+    monkeypatch.setattr(crawler_app, "latest_post_ids", {})
+
+    resolve = crawler_app.resolve_since_post_id
+    # 프로세스 안에 기준점이 없으면 (재시작 직후) DB에 저장된 최근 id에서 멈춘다
+    assert asyncio.run(resolve("005930", None, True)) == ("1003", ["1003", "1002", "1001"])
+    # 이후로는 메모리의 기준점만 쓴다
+    assert asyncio.run(resolve("005930", None, True)) == ("1003", None)
+    assert loaded == ["005930"]
+    # 명시한 since_post_id·비증분 모드는 DB를 읽지 않는다
+    assert asyncio.run(resolve("000660", "42", True)) == ("42", None)
+    assert asyncio.run(resolve("000660", None, False)) == (None, None)
+    assert loaded == ["005930"]
+
+
+def test_incremental_without_saved_posts_is_a_full_crawl(monkeypatch):
+    monkeypatch.setattr(crawler_app, "load_saved_post_ids", lambda stock_id: [])
+    monkeypatch.setattr(crawler_app, "latest_post_ids", {})
+    assert asyncio.run(crawler_app.resolve_since_post_id("005930", None, True)) == (None, None)
+
+
+def test_explicit_zero_scroll_wait_is_kept():
+    assert crawler_app.resolve_scroll_wait_timeout(0) == 0
+    assert crawler_app.resolve_scroll_wait_timeout(None) == crawler_app.SCROLL_WAIT_TIMEOUT
+
+
+FEEDS = [{"postId": "2002", "text": "a", "imageSrcs": []}, {"postId": "2001", "text": "b", "imageSrcs": []}]
+
+
+def _stub_crawl(monkeypatch, saved):
+    async def fake_get_stock_feeds(**kwargs):
+        return list(FEEDS)
+
+    async def fake_iter_stock_feeds(**kwargs):
+        yield list(FEEDS)
+
+    monkeypatch.setattr(crawler_app, "get_stock_feeds", fake_get_stock_feeds)
+    monkeypatch.setattr(crawler_app, "iter_stock_feeds", fake_iter_stock_feeds)
+    monkeypatch.setattr(crawler_app, "save_to_db", lambda stock_id, feeds: saved)
+    latest = {"005930": "1000"}
+    monkeypatch.setattr(crawler_app, "latest_post_ids", latest)
+    return latest
+
+
+def _stream(**kwargs):
+    async def collect():
+        request = crawler_app.CrawlRequest(stock_id="005930", dedup=False, **kwargs)
+        return [event async for event in crawler_app.stream_crawl_events(request)]
+
+    return asyncio.run(collect())
+
+
+def test_preview_crawl_does_not_move_the_mark(monkeypatch):
+    latest = _stub_crawl(monkeypatch, saved={"inserted": 2, "updated": 0})
+    asyncio.run(crawler_app.crawl_stock("005930", save=False, dedup=False))
+    assert _stream(save=False)[-1]["type"] == "done"
+    assert latest == {"005930": "1000"}
+
+
+def test_unsaved_crawl_without_database_does_not_move_the_mark(monkeypatch):
+    # DATABASE_URL이 없으면 save_to_db가 None을 돌려준다
+    latest = _stub_crawl(monkeypatch, saved=None)
+    asyncio.run(crawler_app.crawl_stock("005930", save=True, dedup=False))
+    _stream(save=True)
+    assert latest == {"005930": "1000"}
+
+
+def test_saved_crawl_moves_the_mark(monkeypatch):
+    latest = _stub_crawl(monkeypatch, saved={"inserted": 2, "updated": 0})
+    asyncio.run(crawler_app.crawl_stock("005930", save=True, dedup=False))
+    assert latest == {"005930": "2002"}
+
+    latest["005930"] = "1000"
+    _stream(save=True)
+    assert latest == {"005930": "2002"}
@@ -0,0 +1,128 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, SqliteJobStore
+
+
+def test_jobs_persist_and_recover(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    release = asyncio.Event()
+
+    async def runner(stock_id, **params):
+        await release.wait()
+        if stock_id == "bad":
+            raise RuntimeError("boom")
+        return {"stock_id": stock_id, **params}
+
+    async def first_run():
+        queue = JobQueue(runner, workers=1, store=SqliteJobStore(path))
+        await queue.start()
+        job, deduplicated = await queue.submit("005930", {"max_scrolls": 1})
+        again, deduplicated_again = await queue.submit("005930", {"max_scrolls": 1})
+        pending, _ = await queue.submit("000660", {"max_scrolls": 1})
+        assert not deduplicated and deduplicated_again and again is job
+        release.set()
+        await queue.wait(job, timeout=5)
+        assert job.status == SUCCEEDED
+        # 두 번째 job은 끝나기 전에 종료 → 재시작 시 다시 실행돼야 함
+        release.clear()
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        return job.id, pending.id
+
+    done_id, pending_id = asyncio.run(first_run())
+
+    async def second_run():
+        queue = JobQueue(runner, workers=1, store=SqliteJobStore(path))
+        await queue.start()
+        recovered = await queue.get(pending_id)
+        assert recovered is not None and recovered.status in (QUEUED, "running")
+        release.set()
+        await queue.wait(recovered, timeout=5)
+        assert recovered.status == SUCCEEDED
+        # 메모리에 없는 끝난 job은 SQLite에서 읽는다
+        finished = await queue.get(done_id)
+        assert finished.status == SUCCEEDED and finished.result["stock_id"] == "005930"
+
+        failed, _ = await queue.submit("bad", {})
+        await queue.wait(failed, timeout=5)
+        assert failed.status == FAILED and failed.error == "boom"
+        await queue.stop()
+
+    release = asyncio.Event()
+    asyncio.run(second_run())
+
+
+class FlakyStore:
+    """status가 fail_on인 상태를 기록하려 하면 한 번 실패하는 store (디스크 부족·SQLite lock 흉내)."""
+
+    def __init__(self, fail_on):
+        self.fail_on = set(fail_on)
+        self.saved = []
+
+    def save(self, job):
+        if job.status in self.fail_on:
+            self.fail_on.discard(job.status)
+            raise sqlite3.OperationalError("database is locked")
+        self.saved.append((job.id, job.status))
+
+    def load_unfinished(self):
+        return []
+
+    def close(self):
+        pass
+
+
+async def _runner(stock_id, **params):
+    return {"stock_id": stock_id}
+
+
+def test_persist_failure_fails_the_job_and_keeps_the_worker(capsys):
+    async def run():
+        queue = JobQueue(_runner, workers=1, store=FlakyStore(fail_on=[RUNNING]))
+        await queue.start()
+        job, _ = await queue.submit("005930", {})
+        await queue.wait(job, timeout=5)
+        assert job.status == FAILED and "database is locked" in job.error
+        assert job.finished_at is not None
+
+        # 워커가 살아 있어 다음 job도 실행되고, 같은 요청을 다시 받을 수 있다
+        retry, deduplicated = await queue.submit("005930", {})
+        assert not deduplicated and retry is not job
+        await queue.wait(retry, timeout=5)
+        assert retry.status == SUCCEEDED
+        await queue.stop()
+
+    asyncio.run(run())
+    assert "could not persist job" in capsys.readouterr().out
+
+
+def test_final_persist_failure_still_finishes_the_job():
+    async def run():
+        queue = JobQueue(_runner, workers=1, store=FlakyStore(fail_on=[SUCCEEDED]))
+        await queue.start()
+        job, _ = await queue.submit("005930", {})
+        await queue.wait(job, timeout=5)
+        assert job.done.is_set() and job.status == FAILED
+        assert queue.stats()["in_flight"] == 0
+        await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_submit_persist_failure_does_not_leave_a_stuck_job():
+    async def run():
+        queue = JobQueue(_runner, workers=1, store=FlakyStore(fail_on=[QUEUED]))
+        await queue.start()
+        with pytest.raises(sqlite3.OperationalError):
+            await queue.submit("005930", {})
+        assert queue.stats()["in_flight"] == 0 and queue.stats()["tracked"] == 0
+        job, deduplicated = await queue.submit("005930", {})
+        assert not deduplicated
+        await queue.wait(job, timeout=5)
+        assert job.status == SUCCEEDED
+        await queue.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,55 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from replay import ReplayServer, rewrite_images, write_synthetic_fixtures
+
+
+@pytest.fixture
+def server(tmp_path):
+    write_synthetic_fixtures(str(tmp_path), batches=3, posts_per_batch=4)
+    server = ReplayServer(str(tmp_path), render_delay_ms=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _get(server, path):
+    try:
+        with urllib.request.urlopen(server.base_url + path) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def test_serves_feed_batches_until_end(server):
+    status, page = _get(server, "/stocks/000000/community?feedSortType=RECENT")
+    assert status == 200 and "커뮤니티__게시글".encode() in page
+    assert _get(server, "/__replay/feed/000000?n=2")[0] == 200
+    assert _get(server, "/__replay/feed/000000?n=3")[0] == 404
+
+
+@pytest.mark.parametrize("query", ["n=abc", "n=1.5"])
+def test_malformed_batch_number_is_a_400(server, query):
+    status, body = _get(server, f"/__replay/feed/000000?{query}")
+    assert status == 400
+    # 서버는 계속 응답한다
+    assert _get(server, "/__replay/feed/000000?n=1")[0] == 200
+
+
+def test_rewrite_images_points_at_replay_server():
+    post = (
+        '<li><img alt="a" src="https://static.toss.im/community/abc.jpg?w=640" '
+        'srcset="https://static.toss.im/community/abc.jpg?w=1280 2x"></li>'
+        "<li><img src='https://cdn.example.com/x/y'></li>"
+    )
+    rewritten = rewrite_images(post)
+    assert "toss.im" not in rewritten and "example.com" not in rewritten
+    assert "srcset" not in rewritten
+    assert rewritten.count('src="/__replay/img/') == 1
+    assert rewritten.count("src='/__replay/img/") == 1
+    assert ".jpg" in rewritten
+    # 같은 원본은 같은 재생 URL
+    assert rewrite_images(post) == rewritten
+
@@ -0,0 +1,62 @@
+import pytest
+
+from route_policy import RoutePolicy
+
+
+@pytest.mark.parametrize(
+    "url, resource_type, blocked",
+    [
+        ("https://tossinvest.com/stocks/A005930", "document", False),
+        ("https://static.toss.im/app.js", "script", False),
+        ("https://static.toss.im/app.css", "stylesheet", False),
+        ("https://static.toss.im/logo.png", "image", True),
+        ("https://static.toss.im/clip.mp4", "media", True),
+        ("https://static.toss.im/font.woff2", "font", True),
+        ("data:image/png;base64,AAAA", "image", True),
+        ("blob:https://tossinvest.com/1234", "fetch", False),
+        # 트래커는 서브도메인까지, 리소스 타입과 무관하게 차단
+        ("https://www.google-analytics.com/g/collect", "fetch", True),
+        ("https://STATS.G.DOUBLECLICK.NET/pixel", "xhr", True),
+        ("https://connect.facebook.net/sdk.js", "script", True),
+        # 이름만 비슷한 도메인은 통과
+        ("https://notgoogle-analytics.com/x.js", "script", False),
+        # 트래커 도메인이라도 document는 통과
+        ("https://www.facebook.com/", "document", False),
+    ],
+)
+def test_default_rules(url, resource_type, blocked):
+    assert RoutePolicy().should_block(url, resource_type) is blocked
+
+
+def test_allow_domains_include_subdomains():
+    policy = RoutePolicy(allow_domains=["tossinvest.com"])
+    assert not policy.should_block("https://tossinvest.com/api/feed", "xhr")
+    assert not policy.should_block("https://wts-api.tossinvest.com/api/feed", "fetch")
+    assert policy.should_block("https://cdn.example.com/app.js", "script")
+    assert policy.should_block("https://eviltossinvest.com/app.js", "script")
+    # 허용 도메인 안에서도 리소스 타입 규칙은 그대로
+    assert policy.should_block("https://static.tossinvest.com/logo.png", "image")
+
+
+def test_empty_allow_domains_means_no_restriction():
+    for allow_domains in (None, [], ()):
+        policy = RoutePolicy(allow_domains=allow_domains)
+        assert policy.allow_domains is None
+        assert not policy.should_block("https://cdn.example.com/app.js", "script")
+
+
+def test_custom_rules_replace_defaults():
+    policy = RoutePolicy(block_resource_types=["stylesheet"], block_domains=["example.com"])
+    assert not policy.should_block("https://static.toss.im/logo.png", "image")
+    assert policy.should_block("https://static.toss.im/app.css", "stylesheet")
+    assert policy.should_block("https://a.example.com/x", "fetch")
+    assert not policy.should_block("https://www.google-analytics.com/g/collect", "fetch")
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("CRAWLER_BLOCK_RESOURCE_TYPES", "font, media")
+    monkeypatch.setenv("CRAWLER_ROUTE_POLICY", "OFF")
+    policy = RoutePolicy.from_env(allow_domains=["tossinvest.com"])
+    assert policy.block_resource_types == {"font", "media"}
+    assert policy.allow_domains == ("tossinvest.com",)
+    assert policy.enabled is False
@@ -0,0 +1,110 @@
+import asyncio
+
+import ttl_cache
+from ttl_cache import AsyncTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_failed_refresh_backs_off_until_negative_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, "time", clock.time)
+    cache = AsyncTTLCache(ttl=10, stale_ttl=100, negative_ttl=5)
+    calls = []
+
+    async def ok():
+        calls.append("ok")
+        return {"fee": "1%"}
+
+    async def failing():
+        calls.append("fail")
+        return None
+
+    async def scenario():
+        assert await cache.get("aapl", ok) == ({"fee": "1%"}, None)
+
+        # stale 구간: 이전 값을 주고 백그라운드 갱신 1번 → 실패
+        clock.now += 20
+        value, _ = await cache.get("aapl", failing)
+        assert value == {"fee": "1%"}
+        await asyncio.sleep(0)
+        assert calls == ["ok", "fail"]
+
+        # 백오프 동안에는 요청이 몇 번 와도 다시 크롤링하지 않는다
+        for _ in range(5):
+            clock.now += 0.5
+            value, _ = await cache.get("aapl", failing)
+            assert value == {"fee": "1%"}
+            await asyncio.sleep(0)
+        assert calls == ["ok", "fail"]
+
+        # negative_ttl이 지나면 한 번 더 시도
+        clock.now += 5
+        await cache.get("aapl", ok)
+        await asyncio.sleep(0)
+        assert calls == ["ok", "fail", "ok"]
+        assert cache.stats()["refresh_failures"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_with_exception_also_backs_off(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, "time", clock.time)
+    cache = AsyncTTLCache(ttl=10, stale_ttl=100, negative_ttl=5)
+    calls = []
+
+    async def ok():
+        return 1
+
+    async def boom():
+        calls.append("boom")
+        raise RuntimeError("site down")
+
+    async def scenario():
+        await cache.get("k", ok)
+        clock.now += 20
+        for _ in range(3):
+            assert (await cache.get("k", boom))[0] == 1
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        assert calls == ["boom"]
+
+    asyncio.run(scenario())
+
+
+def test_entries_are_bounded_by_lru(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, "time", clock.time)
+    cache = AsyncTTLCache(ttl=10, stale_ttl=100, negative_ttl=5, max_entries=2)
+    calls = []
+
+    def loader(key, value):
+        async def load():
+            calls.append(key)
+            return value
+
+        return load
+
+    async def scenario():
+        await cache.get("a", loader("a", 1))
+        await cache.get("b", loader("b", None))  # 실패 기록도 한 자리를 차지
+        # a를 다시 쓰면 가장 오래 안 쓴 키는 b
+        assert (await cache.get("a", loader("a", 1)))[1] is not None
+        await cache.get("c", loader("c", 3))
+
+        assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+        assert (await cache.get("a", loader("a", 1)))[1] is not None
+        assert (await cache.get("c", loader("c", 3)))[1] is not None
+        # 버려진 b는 다시 로드
+        await cache.get("b", loader("b", 2))
+        assert calls == ["a", "b", "c", "b"]
+        assert cache.stats()["entries"] == 2
+
+    asyncio.run(scenario())
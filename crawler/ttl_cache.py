@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "failed_at")
+
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+        # 마지막 백그라운드 갱신이 실패한 시각 (성공하면 새 _Entry로 교체되어 None)
+        self.failed_at: Optional[float] = None
+
+
+class AsyncTTLCache:
+    """
+    키별 TTL 캐시 + single-flight + stale-while-revalidate.
+    - ttl 이내: 캐시 값을 바로 반환
+    - ttl ~ stale_ttl: 캐시 값을 바로 반환하고 백그라운드에서 갱신
+    - 그 이후 / 없음: 로드 (같은 키 동시 요청은 하나의 로드를 공유)
+    - 로더가 None을 반환하면 (크롤링 실패·데이터 없음) negative_ttl 동안만 기억하고,
+      이전에 받은 정상 값이 있으면 그 값을 유지
+    - 백그라운드 갱신이 실패(None·예외)하면 negative_ttl 동안은 다시 갱신하지 않는다
+      (실패 중인 사이트를 stale 구간 내내 요청마다 두드리지 않도록)
+    - 키는 최대 max_entries개까지, 넘으면 가장 오래 안 쓴 키부터 버린다
+      (한 번 요청된 symbol·실패 기록이 프로세스가 끝날 때까지 쌓이지 않도록)
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float,
+        negative_ttl: float = 60.0,
+        max_entries: int = 1024,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.negative_ttl = negative_ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+
+    def _fresh_for(self, entry: _Entry) -> float:
+        return self.ttl if entry.value is not None else self.negative_ttl
+
+    async def get(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, Optional[float]]:
+        """(값, 캐시 나이 초) 반환. 방금 로드한 값이면 나이는 None."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = now - entry.stored_at
+            if age < self._fresh_for(entry):
+                self.hits += 1
+                return entry.value, age
+            if entry.value is not None and age < self.stale_ttl:
+                self.stale_hits += 1
+                if entry.failed_at is None or now - entry.failed_at >= self.negative_ttl:
+                    self._load(key, loader)
+                return entry.value, age
+
+        self.misses += 1
+        # shield: 한 요청이 취소돼도 같은 로드를 기다리는 다른 요청은 영향 없음
+        return await asyncio.shield(self._load(key, loader)), None
+
+    def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, loader))
+            # 백그라운드 갱신에서 난 예외도 "never retrieved" 경고 없이 소비
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return task
+
+    def _mark_failed(self, previous: Optional[_Entry]) -> bool:
+        """기존 정상 값이 있으면 실패 시각을 남기고 True (그 값을 계속 쓴다)."""
+        if previous is None or previous.value is None:
+            return False
+        previous.failed_at = time.time()
+        self.refresh_failures += 1
+        return True
+
+    async def _run(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        previous = self._entries.get(key)
+        try:
+            try:
+                value = await loader()
+            except Exception:
+                self._mark_failed(previous)
+                raise
+            if value is None and self._mark_failed(previous):
+                # 갱신 실패 시 기존 정상 값 유지 (negative_ttl 뒤 재시도, stale 구간이 끝나면 다시 로드)
+                return previous.value
+            self._store(key, _Entry(value, time.time()))
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: Hashable, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+        }